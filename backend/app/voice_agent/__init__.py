@@ -1,11 +1,12 @@
 """Agent package for simple voice assistant.
 
 Contains app-specific agent logic (separate from lib/ framework).
-- SimpleAgent: LangChain-based agent with conversation memory
 - MockASR: Testing utility for development without real ASR
+
+The conversation agent itself lives in main.py, built on the framework's
+OpenAICompatibleLLM.
 """
 
-from .simple_agent import SimpleAgent, ConversationState, Message
 from .mock_asr import MockASR
 
-__all__ = ["SimpleAgent", "ConversationState", "Message", "MockASR"]
+__all__ = ["MockASR"]
@@ -20,7 +20,6 @@ Usage:
 import asyncio
 import os
 import tempfile
-from pathlib import Path
 from typing import Optional
 
 from .base import BaseASRProvider, ASRConfig
@@ -98,7 +97,7 @@ class HFSpaceASR(BaseASRProvider):
             client = self._get_client()
 
             # Run prediction in executor to avoid blocking
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             transcription = await loop.run_in_executor(
                 None,
                 lambda: client.predict(
@@ -1,7 +1,7 @@
 """OpenAI Whisper ASR client for premium users."""
 import io
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Any
 from pathlib import Path
 
 from .base import BaseASRProvider, ASRConfig
@@ -13,7 +13,7 @@ from .chunk_tracker import (
     get_tracker_manager,
     ChunkDeliveryMetrics
 )
-from .converter import AudioConverter, ConverterConfig, get_converter
+from .converter import AudioConverter, ConverterConfig, MP3Decoder, get_converter
 from .validator import AudioValidator
 
 __all__ = [
@@ -28,6 +28,7 @@ __all__ = [
     "ChunkDeliveryMetrics",
     "AudioConverter",
     "ConverterConfig",
+    "MP3Decoder",
     "get_converter",
     "AudioValidator",
 ]
@@ -12,9 +12,8 @@ Architecture:
 import asyncio
 import time
 import logging
-from typing import Dict, Set, Optional, List
-from dataclasses import dataclass, field
-from collections import defaultdict
+from typing import Dict, Optional, List
+from dataclasses import dataclass
 
 
 logger = logging.getLogger("audio.chunk_tracker")
@@ -25,7 +25,46 @@ class ConverterConfig:
 
     # FFmpeg settings
     ffmpeg_path: Optional[str] = None  # Auto-detect if None
-    buffer_size: int = 4096  # Read buffer size
+    buffer_size: int = 65536  # Max bytes per PCM read (a read returns what's ready)
+    pipe_limit: int = 1 << 20  # StreamReader buffer for FFmpeg's stdout
+
+
+class MP3Decoder:
+    """
+    A long-lived FFmpeg process decoding a continuous MP3 stream to PCM.
+
+    MP3 is a sequence of self-contained frames, so several clips can be
+    written back to back without restarting FFmpeg. A few milliseconds of
+    decoder/resampler delay stay inside FFmpeg until more input arrives or
+    finish() closes stdin.
+
+    Created by AudioConverter.open_mp3_decoder().
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process, read_size: int):
+        self._process = process
+        self._read_size = read_size
+
+    async def write(self, mp3_chunk: bytes):
+        """Feed MP3 data to FFmpeg."""
+        self._process.stdin.write(mp3_chunk)
+        await self._process.stdin.drain()
+
+    async def read(self) -> bytes:
+        """Read the next available PCM (b"" once FFmpeg has exited)."""
+        return await self._process.stdout.read(self._read_size)
+
+    def finish(self):
+        """Close stdin so FFmpeg flushes its remaining PCM and exits."""
+        if not self._process.stdin.is_closing():
+            self._process.stdin.close()
+
+    async def kill(self):
+        """Stop FFmpeg immediately, discarding anything not yet read."""
+        if self._process.returncode is None:
+            self._process.kill()
+        await self._process.wait()
+        logger.debug(f"FFmpeg decoder exited (PID: {self._process.pid})")
 
 
 class AudioConverter:
@@ -120,6 +159,7 @@ class AudioConverter:
             stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
+            limit=self.config.pipe_limit,
         )
 
         logger.debug(f"Started FFmpeg process for MP3→PCM conversion (PID: {process.pid})")
@@ -172,6 +212,46 @@ class AudioConverter:
 
             logger.debug(f"FFmpeg process completed (return code: {process.returncode})")
 
+    async def open_mp3_decoder(self) -> MP3Decoder:
+        """
+        Start an FFmpeg process for decoding a stream of MP3 clips.
+
+        Unlike mp3_to_pcm_stream, which spawns FFmpeg per clip, the decoder
+        is reused across clips, e.g. every sentence of one response.
+
+        Returns:
+            MP3Decoder (call kill() when done with it)
+        """
+        if not self._ffmpeg_path:
+            raise RuntimeError("FFmpeg not available. Install FFmpeg to enable audio conversion.")
+
+        cmd = [
+            self._ffmpeg_path,
+            # Start decoding after the first frame instead of probing ahead
+            "-probesize", "32",
+            "-analyzeduration", "0",
+            "-fflags", "nobuffer",
+            "-f", "mp3",
+            "-i", "pipe:0",
+            "-f", self.config.output_format,
+            "-ar", str(self.config.output_sample_rate),
+            "-ac", str(self.config.output_channels),
+            "-flush_packets", "1",
+            "-loglevel", "error",
+            "pipe:1"
+        ]
+
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=self.config.pipe_limit,
+        )
+
+        logger.debug(f"Started FFmpeg decoder (PID: {process.pid})")
+        return MP3Decoder(process, self.config.buffer_size)
+
     async def convert_mp3_to_pcm(self, mp3_data: bytes) -> bytes:
         """
         Convert complete MP3 data to PCM.
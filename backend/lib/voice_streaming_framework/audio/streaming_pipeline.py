@@ -14,9 +14,8 @@ What this does NOT do (app-specific):
 - Custom logging → Use standard logging or callbacks
 """
 
-import asyncio
 import logging
-from typing import AsyncGenerator, Optional, Dict, Any, Callable
+from typing import AsyncGenerator, Optional, Dict, Callable
 
 logger = logging.getLogger(__name__)
 
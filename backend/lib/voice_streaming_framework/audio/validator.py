@@ -25,7 +25,8 @@ class AudioValidator:
         energy_threshold: float = 500.0,
         vad_mode: int = 3,
         enable_webrtc_vad: bool = True,
-        speech_ratio_threshold: float = 0.03
+        speech_ratio_threshold: float = 0.03,
+        frame_energy_floor: Optional[float] = None
     ):
         """
         Initialize audio validator.
@@ -35,8 +36,13 @@ class AudioValidator:
             vad_mode: WebRTC VAD aggressiveness (0-3, 3 = most aggressive)
             enable_webrtc_vad: Enable WebRTC VAD validation
             speech_ratio_threshold: Minimum speech ratio (0.01-0.50, default 0.03)
+            frame_energy_floor: Per-frame RMS below which a frame is treated as
+                silence without calling WebRTC VAD (default: energy_threshold / 2)
         """
         self.energy_threshold = energy_threshold
+        self.frame_energy_floor = (
+            energy_threshold / 2 if frame_energy_floor is None else frame_energy_floor
+        )
         self.vad_mode = max(0, min(3, vad_mode))  # Clamp to 0-3
         self.enable_webrtc_vad = enable_webrtc_vad and WEBRTC_VAD_AVAILABLE
         self.speech_ratio_threshold = max(0.01, min(0.50, speech_ratio_threshold))  # Clamp to 0.01-0.50
@@ -62,34 +68,40 @@ class AudioValidator:
         Returns:
             RMS energy value
         """
-        # Handle empty audio bytes
-        if not audio_bytes or len(audio_bytes) == 0:
-            return 0.0
-
         try:
-            # Skip WAV header if present (44 bytes)
-            # Check for RIFF header and sufficient data after header
-            offset = 0
-            if len(audio_bytes) >= 4 and audio_bytes[:4] == b'RIFF':
-                offset = 44
-                # If we only have the header with no actual audio data, return 0.0
-                if len(audio_bytes) <= 44:
-                    return 0.0
-
-            # Convert to numpy array (16-bit PCM)
-            audio_array = np.frombuffer(audio_bytes[offset:], dtype=np.int16)
-
-            if len(audio_array) == 0:
-                return 0.0
-
-            # Calculate RMS (Root Mean Square)
-            rms = np.sqrt(np.mean(audio_array.astype(float) ** 2))
-
-            return float(rms)
+            return self._rms(self._pcm_samples(audio_bytes))
         except Exception as e:
             logging.error(f"Error calculating audio energy: {e}")
             return 0.0
 
+    @staticmethod
+    def _pcm_samples(audio_bytes: bytes) -> np.ndarray:
+        """View WAV/PCM bytes as int16 samples (no copy), skipping a WAV header."""
+        if not audio_bytes:
+            return np.empty(0, dtype=np.int16)
+
+        # Skip WAV header if present (44 bytes)
+        offset = 44 if audio_bytes[:4] == b'RIFF' else 0
+        data = memoryview(audio_bytes)[offset:]
+        # Ignore a trailing odd byte
+        return np.frombuffer(data, dtype=np.int16, count=len(data) // 2)
+
+    @staticmethod
+    def _rms(samples: np.ndarray) -> float:
+        """RMS (Root Mean Square) of int16 samples, computed in float32."""
+        if samples.size == 0:
+            return 0.0
+        x = samples.astype(np.float32)
+        return float(np.sqrt(np.mean(x * x)))
+
+    @staticmethod
+    def _peak(samples: np.ndarray) -> int:
+        """Peak absolute amplitude of int16 samples."""
+        if samples.size == 0:
+            return 0
+        # abs() would overflow on -32768; compare the extremes instead
+        return max(int(samples.max()), -int(samples.min()))
+
     def validate_with_webrtc_vad(
         self,
         audio_bytes: bytes,
@@ -127,13 +139,24 @@ class AudioValidator:
             if frame_size <= 0 or len(audio_data) < frame_size:
                 return False, 0.0
 
+            total_frames = len(audio_data) // frame_size
+
+            # Per-frame RMS in one vectorized pass. If too few frames are above
+            # the silence floor to plausibly reach the speech ratio, reject without
+            # calling the VAD (the returned ratio is then the loud-frame ratio)
+            frames = np.frombuffer(
+                audio_data, dtype=np.int16, count=total_frames * (frame_size // 2)
+            ).reshape(total_frames, frame_size // 2)
+            frame_rms = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+            max_ratio = int(np.count_nonzero(frame_rms >= self.frame_energy_floor)) / total_frames
+            if max_ratio < self.speech_ratio_threshold:
+                return False, max_ratio
+
             speech_frames = 0
-            total_frames = 0
 
             # Process audio in frames
-            for i in range(0, len(audio_data) - frame_size + 1, frame_size):
+            for i in range(0, total_frames * frame_size, frame_size):
                 frame = audio_data[i:i + frame_size]
-                total_frames += 1
 
                 try:
                     is_speech = self.vad.is_speech(frame, sample_rate)
@@ -143,9 +166,6 @@ class AudioValidator:
                     # Frame validation failed, skip
                     continue
 
-            if total_frames == 0:
-                return False, 0.0
-
             # Calculate speech ratio
             speech_ratio = speech_frames / total_frames
 
@@ -180,6 +200,8 @@ class AudioValidator:
         """
         validation_info = {
             "energy": 0.0,
+            "peak": 0,
+            "duration_s": 0.0,
             "energy_valid": False,
             "webrtc_valid": False,
             "webrtc_speech_ratio": 0.0,
@@ -193,8 +215,11 @@ class AudioValidator:
             return True, validation_info
 
         # Stage 1: Energy-based pre-filtering (~1ms)
-        energy = self.calculate_energy(audio_bytes, sample_rate)
+        samples = self._pcm_samples(audio_bytes)
+        energy = self._rms(samples)
         validation_info["energy"] = energy
+        validation_info["peak"] = self._peak(samples)
+        validation_info["duration_s"] = samples.size / sample_rate
 
         if energy < self.energy_threshold:
             validation_info["reason"] = "insufficient_energy"
@@ -2,8 +2,7 @@
 Configuration for the streaming voice pipeline.
 """
 
-from dataclasses import dataclass, field
-from typing import Optional, List
+from dataclasses import dataclass
 
 
 @dataclass
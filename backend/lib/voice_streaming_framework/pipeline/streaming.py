@@ -7,8 +7,8 @@ It orchestrates ASR → LLM → TTS with streaming support for low latency.
 
 import asyncio
 import logging
-import uuid
-from typing import Any, AsyncIterator, Callable, Dict, Optional
+import secrets
+from typing import Any, Callable, Dict, Optional
 
 from .config import PipelineConfig
 from ..asr.base import BaseASRProvider
@@ -16,9 +16,9 @@ from ..llm.base import BaseLLMProvider
 from ..tts.base import TTSProvider as BaseTTSProvider
 from ..text.sentence_aggregator import SentenceAggregator, AggregatorConfig
 from ..transport.base import BaseTransport
-from ..audio.converter import AudioConverter, get_converter
+from ..audio.converter import get_converter
 from ..audio.validator import AudioValidator
-from ..core.types import AudioChunk, AudioFormat, StreamingEvent, StreamingEventType
+from ..core.types import AudioChunk, AudioFormat
 
 logger = logging.getLogger(__name__)
 
@@ -120,7 +120,7 @@ class StreamingVoicePipeline:
             Session ID
         """
         if not session_id:
-            session_id = str(uuid.uuid4())
+            session_id = secrets.token_hex(16)
 
         self._sessions[session_id] = {
             "user_id": user_id,
@@ -4,14 +4,17 @@ This is the FRAMEWORK part - contains ZERO app-specific dependencies.
 Provides core infrastructure for voice streaming sessions.
 """
 import asyncio
-import json
+import shutil
+import secrets
+import subprocess
 import uuid
 import logging
-import base64
 import time
-from typing import Dict, Any, Optional, Set, Callable
+from typing import Dict, Any, Optional, Set, Callable, Union
 from datetime import datetime
-from fastapi import WebSocket, WebSocketDisconnect
+import orjson
+from fastapi import WebSocket
+from starlette.websockets import WebSocketState
 
 
 logger = logging.getLogger(__name__)
@@ -40,7 +43,8 @@ class VoiceSessionManager:
         Initialize session manager.
 
         Args:
-            streaming_handler_factory: Callable that creates streaming handler
+            streaming_handler_factory: Callable(session_id) that creates the
+                session's streaming handler (called once per session)
             webrtc_manager_factory: Callable that returns WebRTC manager
         """
         # Core session state
@@ -53,6 +57,7 @@ class VoiceSessionManager:
         self.tts_streaming_tasks: Dict[str, asyncio.Task] = {}  # session_id -> Task
         self.tts_chunk_counts: Dict[str, int] = {}  # session_id -> chunk_count
         self.ffmpeg_processes: Dict[str, Any] = {}  # session_id -> subprocess
+        self.streaming_handlers: Dict[str, Any] = {}  # session_id -> streaming handler
 
         # Factories (injected by app)
         self.streaming_handler_factory = streaming_handler_factory
@@ -70,6 +75,14 @@ class VoiceSessionManager:
         self.last_error_times: Dict[str, float] = {}
         self.error_throttle_seconds = 1.0
 
+        # Default handlers for framework-level events: event -> handler(session_id, data)
+        self.event_handlers: Dict[str, Callable] = {
+            "interrupt": self.handle_interrupt,
+            "webrtc_offer": self.handle_webrtc_offer,
+            "webrtc_ice_candidate": self.handle_webrtc_ice_candidate,
+            "heartbeat": self.handle_heartbeat,
+        }
+
     def _is_valid_uuid(self, uuid_string: str) -> bool:
         """Check if string is a valid UUID."""
         try:
@@ -88,6 +101,25 @@ class VoiceSessionManager:
             return True
         return False
 
+    def get_handler(self, session_id: str) -> Any:
+        """
+        Get the streaming handler for a session.
+
+        The handler is created by streaming_handler_factory on first use and
+        reused for every later turn of the session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Streaming handler, or None if no factory is configured
+        """
+        handler = self.streaming_handlers.get(session_id)
+        if handler is None and self.streaming_handler_factory:
+            handler = self.streaming_handler_factory(session_id)
+            self.streaming_handlers[session_id] = handler
+        return handler
+
     async def connect(
         self,
         websocket: WebSocket,
@@ -112,7 +144,7 @@ class VoiceSessionManager:
                 logger.info(f"Generated UUID for anonymous user: {user_id[:8]}...")
 
             # Create new session
-            session_id = str(uuid.uuid4())
+            session_id = secrets.token_hex(16)
 
             # Build session data
             session_data = {
@@ -217,6 +249,9 @@ class VoiceSessionManager:
             if session_id in self.tts_chunk_counts:
                 del self.tts_chunk_counts[session_id]
 
+            # Release the per-session streaming handler
+            self.streaming_handlers.pop(session_id, None)
+
             # Clean up FFmpeg process
             if session_id in self.ffmpeg_processes:
                 process = self.ffmpeg_processes[session_id]
@@ -259,7 +294,6 @@ class VoiceSessionManager:
             websocket = self.active_connections[session_id]
 
             # Check if websocket is in correct state
-            from starlette.websockets import WebSocketState
             if websocket.client_state != WebSocketState.CONNECTED:
                 logger.warning(f"WebSocket not in CONNECTED state: {websocket.client_state.name}")
                 if raise_on_error:
@@ -270,7 +304,7 @@ class VoiceSessionManager:
             event = message.get("event", "unknown")
             logger.debug(f"session={session_id[:8]}... | Sending event: {event}")
 
-            await websocket.send_text(json.dumps(message))
+            await websocket.send_text(orjson.dumps(message).decode())
 
         except Exception as e:
             error_msg = f"{type(e).__name__}: {str(e)}"
@@ -294,11 +328,32 @@ class VoiceSessionManager:
             # Otherwise, disconnect if WebSocket is actually closed
             if session_id in self.active_connections:
                 websocket = self.active_connections[session_id]
-                from starlette.websockets import WebSocketState
                 if websocket.client_state == WebSocketState.DISCONNECTED:
                     logger.warning(f"WebSocket disconnected for session {session_id[:8]}...")
                     await self.disconnect(session_id)
 
+    async def send_turn_result(self, session_id: str, transcript: str, response: str):
+        """
+        Send a turn's transcript and agent response as one message.
+
+        For apps that produce the full response before TTS starts; saves a
+        frame and a JSON encode per turn over separate transcript and
+        agent_response events.
+
+        Args:
+            session_id: Session ID
+            transcript: What the user said
+            response: Agent's full response text
+        """
+        await self.send_message(session_id, {
+            "event": "turn_result",
+            "data": {
+                "transcript": transcript,
+                "response": response,
+                "session_id": session_id
+            }
+        })
+
     async def broadcast_message(
         self,
         message: Dict[str, Any],
@@ -430,9 +485,7 @@ class VoiceSessionManager:
                 logger.error(f"❌ Failed to generate WebRTC answer for {session_id[:8]}...")
 
         except Exception as e:
-            logger.error(f"❌ Error handling WebRTC offer: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"❌ Error handling WebRTC offer: {e}")
 
     async def handle_webrtc_ice_candidate(self, session_id: str, data: Dict[str, Any]):
         """Handle WebRTC ICE candidate from client."""
@@ -455,6 +508,10 @@ class VoiceSessionManager:
         except Exception as e:
             logger.error(f"❌ Error handling ICE candidate: {e}")
 
+    async def handle_heartbeat(self, session_id: str, data: Dict[str, Any]):
+        """Handle client heartbeat."""
+        logger.debug(f"💓 Heartbeat received from session {session_id[:8]}...")
+
     async def _stream_tts_to_webrtc(self, session_id: str, text: str, streaming_handler: Any):
         """
         Stream TTS audio to WebRTC track using FFmpeg for real-time MP3->PCM conversion.
@@ -464,10 +521,6 @@ class VoiceSessionManager:
             text: Text to synthesize
             streaming_handler: Handler with stream_tts_audio method
         """
-        import subprocess
-        import asyncio
-        import shutil
-
         # Use print() for guaranteed output in production
         print(f"🎙️ [TTS->WebRTC] Starting for session {session_id[:8]}...")
         print(f"   Text length: {len(text)} chars")
@@ -561,9 +614,7 @@ class VoiceSessionManager:
                     process.stdin.close()
                 except Exception as e:
                     print(f"❌ [write_input] Error: {e}")
-                    logger.error(f"❌ [write_input] Error: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception(f"❌ [write_input] Error: {e}")
 
             async def read_output():
                 """Read PCM chunks from FFmpeg stdout and push to WebRTC."""
@@ -613,9 +664,7 @@ class VoiceSessionManager:
                     logger.info(f"📊 [read_output] Audio duration: {total_audio_duration:.2f}s, push errors: {push_errors}")
                 except Exception as e:
                     print(f"❌ [read_output] Error: {e}")
-                    logger.error(f"❌ [read_output] Error: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception(f"❌ [read_output] Error: {e}")
 
             async def log_ffmpeg_errors():
                 """Log FFmpeg errors/warnings from stderr."""
@@ -658,7 +707,7 @@ class VoiceSessionManager:
         self,
         session_id: str,
         text: str,
-        streaming_handler: Any
+        streaming_handler: Any = None
     ):
         """
         Stream TTS audio back to client via WebRTC.
@@ -667,7 +716,11 @@ class VoiceSessionManager:
             session_id: Session identifier
             text: Text to synthesize
             streaming_handler: Handler with stream_tts_audio method
+                (defaults to the session's handler from get_handler)
         """
+        if streaming_handler is None:
+            streaming_handler = self.get_handler(session_id)
+
         # Use print() for guaranteed output in production
         print(f"🔊 [stream_tts_response] Called for session {session_id[:8]}...")
         logger.info(f"🔊 [stream_tts_response] Called for session {session_id[:8]}...")
@@ -727,7 +780,7 @@ class VoiceSessionManager:
         else:
             logger.debug(f"🔌 WebSocket already closed for session {session_id[:8]}...")
 
-    async def process_message(self, websocket: WebSocket, message: str):
+    async def process_message(self, websocket: WebSocket, message: Union[str, bytes, Dict[str, Any]]):
         """
         Process incoming WebSocket message.
 
@@ -735,10 +788,10 @@ class VoiceSessionManager:
 
         Args:
             websocket: WebSocket connection
-            message: Raw message string
+            message: Raw message (text or bytes frame), or an already-parsed dict
         """
         try:
-            data = json.loads(message)
+            data = message if isinstance(message, dict) else orjson.loads(message)
             event = data.get("event")
             # Check top-level first, then inside data for backwards compatibility
             session_id = data.get("session_id") or data.get("data", {}).get("session_id")
@@ -759,18 +812,13 @@ class VoiceSessionManager:
                 await self.on_message_received(session_id, event, data.get("data", {}))
             else:
                 # Default handlers for framework-level events
-                if event == "interrupt":
-                    await self.handle_interrupt(session_id, data.get("data", {}))
-                elif event == "webrtc_offer":
-                    await self.handle_webrtc_offer(session_id, data.get("data", {}))
-                elif event == "webrtc_ice_candidate":
-                    await self.handle_webrtc_ice_candidate(session_id, data.get("data", {}))
-                elif event == "heartbeat":
-                    logger.debug(f"💓 Heartbeat received from session {session_id[:8]}...")
+                handler = self.event_handlers.get(event)
+                if handler:
+                    await handler(session_id, data.get("data", {}))
                 else:
                     logger.warning(f"⚠️ Unhandled event: {event}")
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.error("❌ Invalid JSON in WebSocket message")
         except Exception as e:
             logger.error(f"❌ Error processing WebSocket message: {e}")
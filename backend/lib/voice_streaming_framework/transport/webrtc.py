@@ -5,7 +5,6 @@ Uses aiortc for WebRTC peer connections with Opus audio codec.
 Provides the lowest latency audio delivery for voice applications.
 """
 
-import asyncio
 import logging
 from typing import Any, Callable, Dict, Optional
 
@@ -5,14 +5,15 @@ A simpler alternative to WebRTC that uses base64-encoded audio over WebSocket.
 Higher latency than WebRTC but easier to deploy and debug.
 """
 
-import asyncio
 import base64
-import json
 import logging
 from typing import Any, Callable, Dict, Optional
 
+import orjson
+from starlette.websockets import WebSocketState
+
 from .base import BaseTransport, TransportConfig
-from ..core.types import AudioChunk, AudioFormat
+from ..core.types import AudioChunk
 
 logger = logging.getLogger(__name__)
 
@@ -122,7 +123,7 @@ class WebSocketTransport(BaseTransport):
                     "is_final": chunk.is_final,
                 }
             }
-            await websocket.send_text(json.dumps(message))
+            await websocket.send_text(orjson.dumps(message).decode())
 
         except Exception as e:
             logger.error(f"Failed to send audio to {session_id[:8]}: {e}")
@@ -140,7 +141,7 @@ class WebSocketTransport(BaseTransport):
             return
 
         try:
-            await websocket.send_text(json.dumps(message))
+            await websocket.send_text(orjson.dumps(message).decode())
         except Exception as e:
             logger.error(f"Failed to send message to {session_id[:8]}: {e}")
 
@@ -155,7 +156,7 @@ class WebSocketTransport(BaseTransport):
             message: Raw message string
         """
         try:
-            data = json.loads(message)
+            data = orjson.loads(message)
             event = data.get("event")
 
             if event == "audio_chunk":
@@ -184,7 +185,6 @@ class WebSocketTransport(BaseTransport):
         # Check WebSocket state (framework-specific)
         try:
             # For Starlette/FastAPI
-            from starlette.websockets import WebSocketState
             return websocket.client_state == WebSocketState.CONNECTED
         except ImportError:
             # Fallback: assume connected if websocket exists
@@ -27,8 +27,15 @@ class TTSProvider(ABC):
 
     All providers must implement stream_audio() which yields MP3 chunks.
     This ensures compatibility with the FFmpeg pipeline (MP3 → PCM 48kHz).
+
+    A provider that can synthesize PCM directly (signed 16-bit LE, mono,
+    48kHz, i.e. what the WebRTC track consumes) sets output_format = "pcm";
+    its chunks then skip FFmpeg entirely.
     """
 
+    # Format of the chunks yielded by stream_audio(): "mp3" or "pcm"
+    output_format: str = "mp3"
+
     def __init__(self, config: Optional[TTSConfig] = None):
         """
         Initialize TTS provider.
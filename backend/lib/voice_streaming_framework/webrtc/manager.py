@@ -1,7 +1,6 @@
 
 import logging
-import uuid
-import json
+import time
 import asyncio
 from typing import Dict, Optional, Any
 from aiortc import RTCPeerConnection, RTCSessionDescription, RTCConfiguration, RTCIceServer, RTCIceCandidate
@@ -9,6 +8,9 @@ from .tracks import TTSAudioTrack
 
 logger = logging.getLogger("webrtc.manager")
 
+# Connection states after which a peer connection will not carry audio again
+STALE_CONNECTION_STATES = ("disconnected", "failed", "closed")
+
 class WebRTCManager:
     """
     Manages WebRTC connections and tracks for voice streaming.
@@ -21,6 +23,9 @@ class WebRTCManager:
         # Track ready events for each session (prevents race condition)
         self.track_ready_events: Dict[str, asyncio.Event] = {}
 
+        # When each unhealthy connection entered a stale state (monotonic time)
+        self.stale_since: Dict[str, float] = {}
+
         # Default STUN servers (will be overridden if Metered.ca is used)
         self.default_rtc_config = RTCConfiguration(iceServers=[
             RTCIceServer(urls=["stun:stun.l.google.com:19302"]),
@@ -75,6 +80,12 @@ class WebRTCManager:
         @pc.on("connectionstatechange")
         async def on_connectionstatechange():
             logger.info(f"🔌 WebRTC connection state for {session_id}: {pc.connectionState}")
+            if self.pcs.get(session_id) is not pc:
+                return
+            if pc.connectionState in STALE_CONNECTION_STATES:
+                self.stale_since.setdefault(session_id, time.monotonic())
+            else:
+                self.stale_since.pop(session_id, None)
             if pc.connectionState == "failed":
                 await self.close_peer_connection(session_id)
 
@@ -123,9 +134,9 @@ class WebRTCManager:
                 "type": pc.localDescription.type
             }
         except Exception as e:
-            logger.error(f"❌ [handle_offer] Error for session {session_id[:8]}...: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"❌ [handle_offer] Error for session {session_id[:8]}...: {e}")
+            # Don't keep a half-negotiated connection around until session end
+            await self.close_peer_connection(session_id)
             return None
 
     async def handle_ice_candidate(self, session_id: str, candidate_data: Dict[str, Any]):
@@ -237,21 +248,53 @@ class WebRTCManager:
 
     async def close_peer_connection(self, session_id: str):
         """Close peer connection and cleanup."""
-        if session_id in self.pcs:
-            pc = self.pcs[session_id]
-            await pc.close()
-            del self.pcs[session_id]
-            logger.info(f"Closed WebRTC connection for {session_id}")
+        # Drop every reference first so the connection, track and sender can be
+        # garbage collected even if close() fails, and a concurrent call is a no-op
+        pc = self.pcs.pop(session_id, None)
+        track = self.tracks.pop(session_id, None)
+        self.senders.pop(session_id, None)
+        self.track_ready_events.pop(session_id, None)
+        self.stale_since.pop(session_id, None)
+
+        if track:
+            track.stop()
+
+        if pc:
+            try:
+                await pc.close()
+                logger.info(f"Closed WebRTC connection for {session_id}")
+            except Exception as e:
+                logger.error(f"❌ Error closing WebRTC connection for {session_id}: {e}")
+
+    async def reap_stale_connections(self, max_age: float = 30.0) -> int:
+        """
+        Close connections that have been disconnected/failed/closed for longer
+        than max_age seconds (e.g. the client vanished without a session end).
 
-        # Clean up track ready event
-        if session_id in self.track_ready_events:
-            del self.track_ready_events[session_id]
+        Returns:
+            Number of connections closed
+        """
+        now = time.monotonic()
+        stale = [
+            session_id for session_id, pc in list(self.pcs.items())
+            if pc.connectionState in STALE_CONNECTION_STATES
+            and now - self.stale_since.setdefault(session_id, now) > max_age
+        ]
+
+        for session_id in stale:
+            logger.info(f"🧹 Reaping stale WebRTC connection for {session_id[:8]}...")
+            await self.close_peer_connection(session_id)
 
-        if session_id in self.tracks:
-            del self.tracks[session_id]
+        return len(stale)
 
-        if session_id in self.senders:
-            del self.senders[session_id]
+    async def run_reaper(self, interval: float = 10.0, max_age: float = 30.0):
+        """Periodically reap stale connections until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reap_stale_connections(max_age)
+            except Exception as e:
+                logger.error(f"❌ WebRTC reaper error: {e}")
 
     async def push_audio_chunk(self, session_id: str, pcm_data: bytes):
         """Push audio data to the track for the given session."""
@@ -4,7 +4,6 @@ import fractions
 import time
 import logging
 import numpy as np
-from typing import Optional
 from av import AudioFrame
 from aiortc import MediaStreamTrack
 
@@ -12,15 +11,17 @@ logger = logging.getLogger("webrtc.tracks")
 
 class TTSAudioTrack(MediaStreamTrack):
     """
-    A MediaStreamTrack that consumes PCM audio chunks from a queue
+    A MediaStreamTrack that consumes PCM audio chunks from a ring buffer
     and yields them as AudioFrames for WebRTC streaming.
 
-    Implements queue size backpressure to prevent excessive buffering.
+    PCM is copied once into a preallocated numpy ring; frames are built from
+    views of it. Implements queued-bytes backpressure to prevent excessive buffering.
     """
     kind = "audio"
 
     # OPTION 3: Queue Size Backpressure
-    # Limit queue to 50 frames (1 second of audio @ 20ms per frame)
+    # Limit the ring to 50 frames' worth of PCM (1 second of audio @ 20ms per
+    # frame), counted in bytes so it holds whatever chunk size producers push.
     # This prevents dumping all audio immediately and allows interruption to work
     MAX_QUEUE_SIZE = 50  # 50 frames × 20ms = 1000ms = 1 second buffer
 
@@ -28,7 +29,6 @@ class TTSAudioTrack(MediaStreamTrack):
         super().__init__()
         # Note: MediaStreamTrack.id is auto-generated, we store custom ID separately
         self.track_label = track_id
-        self.audio_queue = asyncio.Queue()
         self._start_time = None
         self.sample_rate = 48000  # Opus standard sample rate (not 24kHz!)
 
@@ -37,8 +37,17 @@ class TTSAudioTrack(MediaStreamTrack):
         self.samples_per_frame = 960
         self.bytes_per_sample = 2  # 16-bit
         self.bytes_per_frame = self.samples_per_frame * self.bytes_per_sample  # 1920 bytes
+        self.max_queued_bytes = self.MAX_QUEUE_SIZE * self.bytes_per_frame
+
+        # Preallocated ring of max_queued_bytes. _wr/_rd are running byte
+        # offsets; the capacity is a whole number of frames, so a frame read
+        # from _rd never wraps and can be handed to av as a plain view.
+        self._ring = np.zeros(self.max_queued_bytes, dtype=np.uint8)
+        self._wr = 0
+        self._rd = 0
+        self._data_ready = asyncio.Event()
+        self._space_ready = asyncio.Event()
 
-        self.buffer = bytearray()
         self.pts = 0
 
         # Backpressure tracking for checkpoints
@@ -48,32 +57,47 @@ class TTSAudioTrack(MediaStreamTrack):
         
     async def add_frame(self, pcm_data: bytes):
         """
-        Add raw PCM data to the queue with backpressure.
+        Add raw PCM data to the ring with backpressure.
 
         OPTION 3: Queue Size Backpressure Implementation
-        - Waits if queue is full (>= MAX_QUEUE_SIZE)
+        - Waits while the ring is full (MAX_QUEUE_SIZE frames' worth of bytes)
         - Producer automatically throttled to match consumer's rate
         - Prevents dumping all 60s of audio in 1.3s
         """
+        src = np.frombuffer(pcm_data, dtype=np.uint8)
+        capacity = self.max_queued_bytes
+        offset = 0
         wait_start = None
 
-        # BACKPRESSURE: Wait while queue is full
-        while self.audio_queue.qsize() >= self.MAX_QUEUE_SIZE:
-            if wait_start is None:
-                wait_start = time.time()
-                self._backpressure_count += 1
-
-                # Only log first 10 backpressure events, then every 500th event to reduce noise
-                if self._backpressure_count <= 10 or self._backpressure_count % 500 == 0:
-                    queue_size = self.audio_queue.qsize()
-                    logger.info(
-                        f"🔍 CHECKPOINT 10a: BACKPRESSURE TRIGGERED - Queue full "
-                        f"({queue_size}/{self.MAX_QUEUE_SIZE} frames = {queue_size * 0.02:.2f}s buffered). "
-                        f"Waiting for consumer... (backpressure event #{self._backpressure_count})"
-                    )
-
-            # Wait 10ms and check again
-            await asyncio.sleep(0.01)
+        while offset < len(src):
+            free = capacity - self.queued_bytes
+
+            # BACKPRESSURE: Wait while ring is full
+            if free == 0:
+                if wait_start is None:
+                    wait_start = time.time()
+                    self._backpressure_count += 1
+
+                    # Only log first 10 backpressure events, then every 500th event to reduce noise
+                    if self._backpressure_count <= 10 or self._backpressure_count % 500 == 0:
+                        logger.info(
+                            f"🔍 CHECKPOINT 10a: BACKPRESSURE TRIGGERED - Queue full "
+                            f"({self.queued_bytes}/{self.max_queued_bytes}B = {self._queued_seconds():.2f}s buffered). "
+                            f"Waiting for consumer... (backpressure event #{self._backpressure_count})"
+                        )
+
+                # Woken by recv() taking a frame or by flush()
+                self._space_ready.clear()
+                await self._space_ready.wait()
+                continue
+
+            # Copy up to the free space, split at the end of the ring
+            start = self._wr % capacity
+            n = min(free, len(src) - offset, capacity - start)
+            self._ring[start:start + n] = src[offset:offset + n]
+            self._wr += n
+            offset += n
+            self._data_ready.set()
 
         # Track wait time if we had to wait
         if wait_start is not None:
@@ -84,65 +108,64 @@ class TTSAudioTrack(MediaStreamTrack):
             if self._backpressure_count <= 10 or self._backpressure_count % 500 == 0:
                 logger.info(
                     f"🔍 CHECKPOINT 10b: BACKPRESSURE RELEASED - Waited {wait_duration:.3f}s, "
-                    f"queue now has space ({self.audio_queue.qsize()}/{self.MAX_QUEUE_SIZE}). "
+                    f"queue now has space ({self.queued_bytes}/{self.max_queued_bytes}B). "
                     f"Total wait time: {self._total_wait_time:.2f}s"
                 )
 
-        # Add frame to queue
-        await self.audio_queue.put(pcm_data)
         self._total_chunks_pushed += 1
 
-        queue_size = self.audio_queue.qsize()
-
         # Log queue size periodically
-        if self._total_chunks_pushed % 50 == 0:  # Every 50 chunks (1 second)
+        if self._total_chunks_pushed % 50 == 0:  # Every 50 chunks
             logger.info(
                 f"🔍 CHECKPOINT 10: WebRTC track - Pushed {self._total_chunks_pushed} chunks, "
-                f"queue size={queue_size}/{self.MAX_QUEUE_SIZE} (~{queue_size * 0.02:.2f}s buffered), "
+                f"queued={self.queued_bytes}B (~{self._queued_seconds():.2f}s buffered), "
                 f"backpressure events={self._backpressure_count}"
             )
 
     async def flush(self):
         """Flush all buffered audio on interruption."""
-        queue_size_before = self.audio_queue.qsize()
-        buffer_size_before = len(self.buffer)
+        queued_bytes_before = self.queued_bytes
+        queued_seconds_before = self._queued_seconds()
 
         logger.warning(
-            f"🔍 CHECKPOINT 11: FLUSH STARTED - Queue: {queue_size_before} frames "
-            f"(~{queue_size_before * 0.02:.2f}s), Buffer: {buffer_size_before}B, "
+            f"🔍 CHECKPOINT 11: FLUSH STARTED - Queue: {queued_bytes_before}B "
+            f"(~{queued_seconds_before:.2f}s), "
             f"Backpressure events: {self._backpressure_count}, Total wait time: {self._total_wait_time:.2f}s"
         )
 
-        # Clear buffer
-        self.buffer.clear()
-
-        # Drain queue
-        flushed_count = 0
-        while not self.audio_queue.empty():
-            try:
-                self.audio_queue.get_nowait()
-                flushed_count += 1
-            except:
-                break
+        # Drop everything in the ring (the storage itself is reused), then
+        # queue one frame of silence, so the receiver hears a clean stop
+        # rather than the last frame cut off
+        self._ring[:self.bytes_per_frame] = 0
+        self._rd = 0
+        self._wr = self.bytes_per_frame
 
         logger.warning(
-            f"🔍 CHECKPOINT 12: FLUSH COMPLETED - Flushed {flushed_count} frames "
-            f"(~{flushed_count * 0.02:.2f}s of audio), Buffer cleared: {buffer_size_before}B"
+            f"🔍 CHECKPOINT 12: FLUSH COMPLETED - Flushed {queued_bytes_before}B "
+            f"(~{queued_seconds_before:.2f}s of audio)"
         )
-        logger.info(f"🧹 Flushed {flushed_count} queued frames and buffer for track {self.track_label}")
+        logger.info(f"🧹 Flushed ring buffer for track {self.track_label}")
 
-        # CRITICAL FIX: Wake up recv() by adding sentinel value
-        # After flush, recv() might be stuck waiting on queue.get()
-        # Adding None signals recv() to continue (it will buffer silence internally)
-        await self.audio_queue.put(None)
-        logger.info(f"🔇 Added sentinel to wake up recv() after flush")
+        # Release a producer blocked on a full ring, and wake recv() so it
+        # re-checks the (now empty) ring instead of acting on stale state
+        self._space_ready.set()
+        self._data_ready.set()
 
         # Reset tracking counters after flush
         self._total_chunks_pushed = 0
         self._total_wait_time = 0.0
         self._backpressure_count = 0
 
-    def _create_audio_frame(self, pcm_data: bytes) -> AudioFrame:
+    @property
+    def queued_bytes(self) -> int:
+        """PCM bytes written to the ring and not yet sent by recv()."""
+        return self._wr - self._rd
+
+    def _queued_seconds(self) -> float:
+        """Duration of the PCM waiting in the ring."""
+        return self.queued_bytes / (self.sample_rate * self.bytes_per_sample)
+
+    def _create_audio_frame(self, pcm_data) -> AudioFrame:
         """Convert raw PCM bytes to av.AudioFrame.
 
         CRITICAL: Creates frame with explicit format to ensure planes are always populated.
@@ -155,6 +178,7 @@ class TTSAudioTrack(MediaStreamTrack):
                 f"expected {self.bytes_per_frame} bytes. Padding with silence."
             )
             # Pad or truncate to correct size
+            pcm_data = bytes(pcm_data)
             if len(pcm_data) < self.bytes_per_frame:
                 pcm_data = pcm_data + b'\x00' * (self.bytes_per_frame - len(pcm_data))
             else:
@@ -188,13 +212,8 @@ class TTSAudioTrack(MediaStreamTrack):
             logger.info(f"🎬 TTSAudioTrack.recv() started for {self.track_label}")
 
         while True:
-            # Check if we have enough data in buffer
-            if len(self.buffer) >= self.bytes_per_frame:
-                # CRITICAL: Extract frame data BEFORE any await to prevent race condition
-                # If we await before extracting, flush() could clear the buffer mid-extraction
-                frame_data = self.buffer[:self.bytes_per_frame]
-                self.buffer = self.buffer[self.bytes_per_frame:]
-
+            # Check if we have enough data in the ring
+            if self.queued_bytes >= self.bytes_per_frame:
                 # CRITICAL FIX: Add pacing to yield frames at correct rate (20ms intervals)
                 # Without this, all frames are sent immediately causing buffer issues
                 current_time = time.time()
@@ -209,38 +228,25 @@ class TTSAudioTrack(MediaStreamTrack):
                         # Wait to maintain proper frame timing
                         await asyncio.sleep(sleep_time)
 
+                        # flush() may have emptied the ring while we slept
+                        if self.queued_bytes < self.bytes_per_frame:
+                            continue
+
                 self._last_frame_time = time.time()
 
+                # CRITICAL: Build the frame from the ring and release the slot with
+                # no await in between, so flush() or add_frame() can't touch it mid-copy
+                start = self._rd % self.max_queued_bytes
+                frame = self._create_audio_frame(self._ring[start:start + self.bytes_per_frame])
+                self._rd += self.bytes_per_frame
+                self._space_ready.set()
+
                 self._frame_count += 1
                 if self._frame_count <= 3 or self._frame_count % 50 == 0:
-                    logger.info(f"📹 Frame {self._frame_count}: {len(frame_data)} bytes, pts={self.pts}")
-
-                return self._create_audio_frame(frame_data)
-
-            # Need more data
-            try:
-                # Wait for data from queue
-                new_data = await self.audio_queue.get()
-
-                # Handle end of stream or silence
-                if new_data is None:
-                    # If buffer has leftover, pad with silence and return it
-                    if len(self.buffer) > 0:
-                        padding = self.bytes_per_frame - len(self.buffer)
-                        self.buffer.extend(b'\x00' * padding)
-                        logger.info(f"🔇 Padding final frame with {padding} bytes of silence")
-                        continue
-                    else:
-                        # If queue explicitly sends None, we can yield silence to keep stream alive
-                        # or just wait for more real data.
-                        # For continuous voice, silence is safer than closing track.
-                        self.buffer.extend(b'\x00' * self.bytes_per_frame)
-                        logger.debug(f"🔇 Sending silence frame to keep track alive")
-                        continue
-
-                self.buffer.extend(new_data)
-
-            except Exception as e:
-                logger.error(f"❌ Error in TTSAudioTrack.recv: {e}")
-                # Return silence on error to prevent crash
-                return self._create_audio_frame(b'\x00' * self.bytes_per_frame)
+                    logger.info(f"📹 Frame {self._frame_count}: {self.bytes_per_frame} bytes, pts={frame.pts}")
+
+                return frame
+
+            # Need more data: wait for add_frame() (or flush()) to signal
+            self._data_ready.clear()
+            await self._data_ready.wait()
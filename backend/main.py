@@ -12,32 +12,70 @@ Usage:
 """
 
 import asyncio
-import base64
-import json
+import atexit
+import binascii
+import io
 import logging
 import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import secrets
 import time
-import uuid
+import wave
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import time as dt_time
-from typing import Dict, Any, Optional
+from functools import partial
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
 
+import aiohttp
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 
-# Load environment variables from .env file
-try:
-    from dotenv import load_dotenv
-    _project_root = Path(__file__).parent
-    env_path = _project_root / ".env"
-    if env_path.exists():
-        load_dotenv(env_path)
-        print(f"✅ Loaded environment from {env_path}")
-    else:
-        print(f"⚠️  No .env file found at {env_path}")
-except ImportError:
-    print("⚠️  python-dotenv not installed")
+# Configure logging
+# Records are queued and formatted and written to stderr by a listener
+# thread, so neither formatting nor a slow console blocks the event loop
+# (e.g. under a burst of tracebacks)
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_listener = QueueListener(_log_queue, _log_stream)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queue records unformatted: %-args and tracebacks are rendered by the listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+logging.basicConfig(level=logging.INFO, handlers=[_DeferredQueueHandler(_log_queue)])
+logger = logging.getLogger(__name__)
+
+_project_root = Path(__file__).resolve().parent
+
+# Load environment variables from .env file (production injects them directly)
+if os.environ.get("ENVIRONMENT") != "production":
+    try:
+        from dotenv import load_dotenv
+        env_path = _project_root / ".env"
+        if env_path.exists():
+            load_dotenv(env_path)
+            logger.info(f"✅ Loaded environment from {env_path}")
+        else:
+            logger.warning(f"⚠️  No .env file found at {env_path}")
+    except ImportError:
+        logger.warning("⚠️  python-dotenv not installed")
 
 # Import new pipeline components
 from lib.voice_streaming_framework import (
@@ -50,19 +88,12 @@ from lib.voice_streaming_framework import (
 )
 from lib.voice_streaming_framework.asr import HFSpaceASR
 from lib.voice_streaming_framework.tts import get_tts_provider, TTSConfig
-from lib.voice_streaming_framework.audio import AudioValidator
+from lib.voice_streaming_framework.audio import AudioValidator, MP3Decoder
 from lib.voice_streaming_framework.webrtc.manager import WebRTCManager
 
 # Scheduler for keeping HF Space alive
 from scheduler.daily_asr_scheduler import DailyASRScheduler
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -71,9 +102,33 @@ SYSTEM_PROMPT = """你是一个有帮助的语音助手。保持回复简洁自
 用户用什么语言提问，你就用什么语言回答。"""
 
 # Audio settings
-BUFFER_TIMEOUT = 1.5  # seconds to wait before processing audio buffer
+# The buffer is processed after BUFFER_TIMEOUT seconds of silence, or as soon
+# as FLUSH_BYTES have been buffered, whichever comes first.
+BUFFER_TIMEOUT = float(os.environ.get("AUDIO_BUFFER_TIMEOUT", "1.5"))
+FLUSH_BYTES = int(os.environ.get("AUDIO_FLUSH_BYTES", str(64 * 1024)))
 MIN_AUDIO_ENERGY = 500.0
 MIN_SPEECH_RATIO = 0.03
+# Clips shorter than MIN_ASR_DURATION that only just clear the energy
+# threshold are VAD false positives; don't spend an ASR call on them
+MIN_ASR_DURATION = 0.5
+ASR_HARD_FLOOR = 2 * MIN_AUDIO_ENERGY
+
+# Pending outgoing messages per session: past this, droppable events are
+# shed, and a client that still can't keep up is disconnected
+OUTBOX_LIMIT = 64
+# Close code for a client too slow to read its events ("try again later")
+OUTBOX_OVERFLOW_CLOSE_CODE = 1013
+# Progress events a slow client can miss without losing state
+DROPPABLE_EVENTS = frozenset({"llm_sentence"})
+
+# Sentences whose TTS request may run ahead of the one being played
+TTS_PREFETCH = 2
+
+# Fetched TURN credentials are reused for this many seconds
+ICE_SERVERS_TTL = 3600
+
+# Last successful FFmpeg check ("<path>:<mtime>"), reused across reloads
+FFMPEG_CHECK_CACHE = Path(tempfile.gettempdir()) / ".ffmpeg_ok"
 
 # ============================================================================
 # GLOBAL STATE
@@ -88,10 +143,71 @@ webrtc_manager: WebRTCManager = None
 sentence_aggregator: SentenceAggregator = None
 audio_converter: AudioConverter = None
 
+# Background tasks are owned by this group (entered in lifespan)
+task_group: Optional[asyncio.TaskGroup] = None
+
+
+
+@dataclass(slots=True)
+class SessionState:
+    """Everything the server tracks for one voice session (slotted: fixed fields)."""
+    user_id: str
+    # Weak, so a task that outlives the connection doesn't keep it alive
+    ws_ref: weakref.ref
+    is_active: bool = True
+    created_at: float = field(default_factory=time.time)
+
+    # Set while a response is being spoken; cleared to stop it (interrupt)
+    speaking: asyncio.Event = field(default_factory=asyncio.Event)
+
+    # Serializes turns: ASR → LLM → TTS for one segment at a time
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    # Audio buffer, flushed by the debouncer task
+    buffer: bytearray = field(default_factory=bytearray)
+    chunk_count: int = 0
+    last_chunk_time: float = field(default_factory=time.monotonic)
+    chunk_event: asyncio.Event = field(default_factory=asyncio.Event)
+    flush_now: bool = False
+    debouncer: Optional[asyncio.Task] = None
+
+    # Current processing task (cancelled on interrupt)
+    active_task: Optional[asyncio.Task] = None
+    # Segments for active_task while its utterance is still open (the last
+    # segment was flushed on size), so the rest joins the same turn
+    segments: Optional[asyncio.Queue] = None
+
+    # ICE servers sent in the welcome; reused for this session's offer
+    ice_servers: Optional[list] = None
+
+    # Outgoing messages, drained by the writer task. With batch_frames,
+    # messages queued together go out as one newline-delimited frame; with
+    # binary_frames, frames are sent as binary (UTF-8 JSON) instead of text.
+    outbox: deque = field(default_factory=deque)
+    outbox_ready: asyncio.Event = field(default_factory=asyncio.Event)
+    batch_frames: bool = False
+    binary_frames: bool = False
+    writer: Optional[asyncio.Task] = None
+
+    @property
+    def websocket(self) -> Optional[WebSocket]:
+        """The client connection, or None once it has been released."""
+        return self.ws_ref()
+
+    def tasks(self) -> list[asyncio.Task]:
+        """The session's background tasks that are still running."""
+        return [t for t in (self.active_task, self.debouncer, self.writer) if t and not t.done()]
+
+
 # Session state
-sessions: Dict[str, Dict[str, Any]] = {}  # session_id -> session data
-audio_buffers: Dict[str, Dict] = {}  # session_id -> audio buffer
-active_tasks: Dict[str, asyncio.Task] = {}  # session_id -> processing task
+sessions: Dict[str, SessionState] = {}  # session_id -> session state
+
+# Shared HTTP client (keep-alive connections to Metered.ca)
+http_session: Optional[aiohttp.ClientSession] = None
+
+# ICE servers: (fetched_at monotonic time, ice_servers)
+_ice_cache: Optional[tuple[float, list]] = None
+_ice_lock = asyncio.Lock()
 
 # Scheduler
 asr_scheduler: DailyASRScheduler = None
@@ -103,13 +219,23 @@ asr_scheduler_task: asyncio.Task = None
 # ============================================================================
 
 def check_ffmpeg_availability():
-    """Check if FFmpeg is available in PATH."""
-    import shutil
-    import subprocess
+    """
+    Check if FFmpeg is available in PATH.
 
+    A successful check is remembered in FFMPEG_CHECK_CACHE, keyed by the
+    binary's path and mtime, so reloads skip spawning `ffmpeg -version`.
+    """
     ffmpeg_path = shutil.which("ffmpeg")
     if ffmpeg_path:
         logger.info(f"✅ FFmpeg found at: {ffmpeg_path}")
+
+        cache_key = f"{ffmpeg_path}:{os.stat(ffmpeg_path).st_mtime}"
+        try:
+            if FFMPEG_CHECK_CACHE.read_text() == cache_key:
+                return True
+        except OSError:
+            pass
+
         try:
             result = subprocess.run(
                 ["ffmpeg", "-version"],
@@ -119,15 +245,36 @@ def check_ffmpeg_availability():
             )
             version_line = result.stdout.split('\n')[0] if result.stdout else "unknown"
             logger.info(f"   FFmpeg version: {version_line}")
-            return True
         except Exception as e:
             logger.error(f"❌ FFmpeg version check failed: {e}")
             return False
+
+        try:
+            FFMPEG_CHECK_CACHE.write_text(cache_key)
+        except OSError:
+            pass
+        return True
     else:
         logger.error("❌ FFmpeg NOT found in PATH!")
         return False
 
 
+def spawn_task(coro) -> asyncio.Task:
+    """
+    Run a coroutine as a child of the server's TaskGroup.
+
+    Errors are logged here rather than propagated, so that one failing
+    session does not cancel every other task in the group.
+    """
+    async def _run():
+        try:
+            await coro
+        except Exception:
+            logger.exception("❌ Background task failed")
+
+    return task_group.create_task(_run())
+
+
 def _custom_exception_handler(loop, context):
     """Suppress non-critical ICE/STUN errors."""
     exception = context.get("exception")
@@ -135,14 +282,31 @@ def _custom_exception_handler(loop, context):
         exception_str = str(type(exception).__name__)
         exception_msg = str(exception)
         if "TransactionFailed" in exception_str or "STUN transaction failed" in exception_msg:
-            logger.debug(f"ICE candidate failed (non-critical): {exception}")
+            logger.debug("ICE candidate failed (non-critical): %s", exception)
             return
     loop.default_exception_handler(context)
 
 
 async def fetch_ice_servers(session_id: str) -> list:
-    """Fetch STUN/TURN servers for WebRTC."""
-    import aiohttp
+    """
+    Get STUN/TURN servers for WebRTC.
+
+    Served from a cache refreshed at most once per ICE_SERVERS_TTL; the lock
+    makes concurrent callers on an expired cache share a single fetch.
+    """
+    if _ice_cache and time.monotonic() - _ice_cache[0] < ICE_SERVERS_TTL:
+        return _ice_cache[1]
+
+    async with _ice_lock:
+        # Another caller may have refreshed the cache while we waited
+        if _ice_cache and time.monotonic() - _ice_cache[0] < ICE_SERVERS_TTL:
+            return _ice_cache[1]
+        return await _refresh_ice_servers()
+
+
+async def _refresh_ice_servers() -> list:
+    """Fetch STUN/TURN servers and cache them unless Metered.ca failed."""
+    global _ice_cache
 
     ice_servers = [
         {"urls": "stun:stun.l.google.com:19302"},
@@ -154,26 +318,58 @@ async def fetch_ice_servers(session_id: str) -> list:
 
     if metered_api_key and metered_url:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{metered_url}?apiKey={metered_api_key}",
-                    timeout=aiohttp.ClientTimeout(total=5)
-                ) as response:
-                    if response.status == 200:
-                        turn_servers = await response.json()
-                        ice_servers.extend(turn_servers)
-                        logger.info(f"🔧 Got {len(turn_servers)} TURN servers from Metered.ca")
-                    else:
-                        ice_servers.extend(_get_openrelay_servers())
+            async with http_session.get(
+                f"{metered_url}?apiKey={metered_api_key}",
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                if response.status == 200:
+                    turn_servers = await response.json()
+                    ice_servers.extend(turn_servers)
+                    logger.info("🔧 Got %s TURN servers from Metered.ca", len(turn_servers))
+                else:
+                    # Don't cache the fallback; retry Metered.ca next time
+                    ice_servers.extend(_get_openrelay_servers())
+                    return ice_servers
         except Exception as e:
-            logger.warning(f"⚠️ Failed to fetch TURN credentials: {e}")
+            logger.warning("⚠️ Failed to fetch TURN credentials: %s", e)
             ice_servers.extend(_get_openrelay_servers())
+            return ice_servers
     else:
         ice_servers.extend(_get_openrelay_servers())
 
+    _ice_cache = (time.monotonic(), ice_servers)
     return ice_servers
 
 
+async def _keep_ice_servers_fresh():
+    """Refresh the ICE server cache ahead of expiry, off the session path."""
+    while True:
+        try:
+            async with _ice_lock:
+                await _refresh_ice_servers()
+        except Exception as e:
+            logger.warning("⚠️ ICE server refresh failed: %s", e)
+        await asyncio.sleep(ICE_SERVERS_TTL * 0.9)
+
+
+def _create_llm_provider() -> Optional[OpenAICompatibleLLM]:
+    """Create the LLM provider (OpenAI-compatible: ZhipuAI), if configured."""
+    zhipuai_api_key = os.environ.get("ZHIPUAI_API_KEY")
+    if not zhipuai_api_key:
+        return None
+
+    return OpenAICompatibleLLM(
+        config=LLMConfig(
+            model="glm-4-flash",
+            system_prompt=SYSTEM_PROMPT,
+            temperature=0.7,
+            max_tokens=1024,
+        ),
+        api_key=zhipuai_api_key,
+        base_url="https://open.bigmodel.cn/api/paas/v4/"
+    )
+
+
 def _get_openrelay_servers() -> list:
     """Get OpenRelay free TURN servers as fallback."""
     return [
@@ -192,111 +388,130 @@ async def lifespan(app: FastAPI):
     """Initialize and cleanup global resources."""
     global llm_provider, asr_provider, tts_provider, audio_validator
     global webrtc_manager, sentence_aggregator, audio_converter
-    global asr_scheduler, asr_scheduler_task
+    global asr_scheduler, asr_scheduler_task, task_group, _ice_lock, http_session
 
     # Initialize scheduler variables to None to avoid UnboundLocalError
     asr_scheduler = None
     asr_scheduler_task = None
 
     # Set custom exception handler
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
     loop.set_exception_handler(_custom_exception_handler)
 
+    # Blocking work (audio validation, FFmpeg probes, provider construction
+    # and aiortc's Opus encoder) runs in the default executor. Mostly I/O
+    # and GIL-releasing, so keep asyncio's default size, min(32, cpus + 4),
+    # rather than one thread per CPU
+    loop.set_default_executor(ThreadPoolExecutor(thread_name_prefix="voice-agent"))
+
+    # Locks bind to the first loop they wait on; use a fresh one per server run
+    _ice_lock = asyncio.Lock()
+
+    http_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=300)
+    )
+
     logger.info("🚀 Starting Voice Agent Demo Server (v2 - Pipeline)...")
-    logger.info(f"📍 Environment: {os.environ.get('ENVIRONMENT', 'development')}")
+    logger.info("📍 Environment: %s", os.environ.get('ENVIRONMENT', 'development'))
+
+    # Every component is independent: construct them concurrently in the
+    # default executor (the FFmpeg check shells out to `ffmpeg -version`)
+    (
+        ffmpeg_ok,
+        llm_provider,
+        asr_provider,
+        tts_provider,
+        audio_validator,
+        webrtc_manager,
+        sentence_aggregator,
+        audio_converter,
+    ) = await asyncio.gather(
+        loop.run_in_executor(None, check_ffmpeg_availability),
+        loop.run_in_executor(None, _create_llm_provider),
+        loop.run_in_executor(None, partial(HFSpaceASR, space_name="hz6666/SenseVoiceSmall")),
+        loop.run_in_executor(None, partial(get_tts_provider, "edge-tts", TTSConfig(
+            voice="zh-CN-XiaoxiaoNeural",
+            rate="+0%"
+        ))),
+        loop.run_in_executor(None, partial(
+            AudioValidator,
+            energy_threshold=MIN_AUDIO_ENERGY,
+            vad_mode=3,
+            enable_webrtc_vad=True,
+            speech_ratio_threshold=MIN_SPEECH_RATIO
+        )),
+        loop.run_in_executor(None, WebRTCManager),
+        # Sentence aggregator (for streaming LLM → TTS)
+        loop.run_in_executor(None, SentenceAggregator, AggregatorConfig(
+            min_chars=15,
+            max_wait_chars=200,
+        )),
+        loop.run_in_executor(None, get_converter),
+    )
 
-    # Check FFmpeg
-    if not check_ffmpeg_availability():
+    if not ffmpeg_ok:
         logger.warning("⚠️  Audio output may not work without FFmpeg!")
-
-    # Initialize LLM provider (OpenAI-compatible: ZhipuAI)
-    zhipuai_api_key = os.environ.get("ZHIPUAI_API_KEY")
-    if zhipuai_api_key:
-        llm_provider = OpenAICompatibleLLM(
-            config=LLMConfig(
-                model="glm-4-flash",
-                system_prompt=SYSTEM_PROMPT,
-                temperature=0.7,
-                max_tokens=1024,
-            ),
-            api_key=zhipuai_api_key,
-            base_url="https://open.bigmodel.cn/api/paas/v4/"
-        )
+    if llm_provider:
         logger.info("✅ LLM provider initialized (ZhipuAI GLM-4-flash)")
     else:
         logger.error("❌ ZHIPUAI_API_KEY not set! LLM will not work.")
-
-    # Initialize ASR provider
-    asr_provider = HFSpaceASR(space_name="hz6666/SenseVoiceSmall")
     logger.info("✅ ASR provider initialized (HF Space - SenseVoiceSmall)")
-
-    # Initialize TTS provider
-    tts_provider = get_tts_provider("edge-tts", TTSConfig(
-        voice="zh-CN-XiaoxiaoNeural",
-        rate="+0%"
-    ))
     logger.info("✅ TTS provider initialized (Edge TTS)")
-
-    # Initialize audio validator
-    audio_validator = AudioValidator(
-        energy_threshold=MIN_AUDIO_ENERGY,
-        vad_mode=3,
-        enable_webrtc_vad=True,
-        speech_ratio_threshold=MIN_SPEECH_RATIO
-    )
     logger.info("✅ Audio validator initialized")
-
-    # Initialize WebRTC manager
-    webrtc_manager = WebRTCManager()
     logger.info("✅ WebRTC manager initialized")
-
-    # Initialize sentence aggregator (for streaming LLM → TTS)
-    sentence_aggregator = SentenceAggregator(AggregatorConfig(
-        min_chars=15,
-        max_wait_chars=200,
-    ))
     logger.info("✅ Sentence aggregator initialized")
+    logger.info("✅ Audio converter initialized (FFmpeg available: %s)", audio_converter.is_available())
 
-    # Initialize audio converter
-    audio_converter = get_converter()
-    logger.info(f"✅ Audio converter initialized (FFmpeg available: {audio_converter.is_available()})")
+    async with asyncio.TaskGroup() as tg:
+        task_group = tg
 
-    # Initialize ASR scheduler
-    voice_sample_path = Path(__file__).parent / "scheduler" / "voice_sample" / "test_analysis_aapl_deeper.wav"
-    if voice_sample_path.exists():
-        asr_scheduler = DailyASRScheduler(
-            audio_path=str(voice_sample_path),
-            run_time=dt_time(hour=9, minute=0)
-        )
-        asr_scheduler_task = asyncio.create_task(asr_scheduler.start())
-        logger.info("✅ Daily ASR scheduler started")
+        # Initialize ASR scheduler
+        voice_sample_path = _project_root / "scheduler" / "voice_sample" / "test_analysis_aapl_deeper.wav"
+        if voice_sample_path.exists():
+            asr_scheduler = DailyASRScheduler(
+                audio_path=str(voice_sample_path),
+                run_time=dt_time(hour=9, minute=0)
+            )
+            asr_scheduler_task = spawn_task(asr_scheduler.start())
+            logger.info("✅ Daily ASR scheduler started")
 
-    logger.info("🎉 Server ready! Connect on ws://localhost:8000/ws")
+        # Close peer connections left disconnected/failed by vanished clients
+        webrtc_reaper_task = spawn_task(webrtc_manager.run_reaper())
 
-    yield
+        ice_refresh_task = spawn_task(_keep_ice_servers_fresh())
 
-    # Cleanup
-    logger.info("🛑 Shutting down server...")
+        logger.info("🎉 Server ready! Connect on ws://localhost:8000/ws")
 
-    # Cancel all active tasks
-    for session_id, task in list(active_tasks.items()):
-        task.cancel()
-        try:
-            await task
-        except asyncio.CancelledError:
-            pass
+        yield
 
-    # Stop scheduler
-    if asr_scheduler:
-        asr_scheduler.stop()
-    if asr_scheduler_task:
-        asr_scheduler_task.cancel()
+        # Cleanup
+        logger.info("🛑 Shutting down server...")
+
+        # Cancel per-session work and wait for it to unwind
+        for session_id in list(sessions):
+            await cleanup_session(session_id)
+
+        # Stop scheduler
+        if asr_scheduler:
+            asr_scheduler.stop()
+        if asr_scheduler_task:
+            asr_scheduler_task.cancel()
+        webrtc_reaper_task.cancel()
+        ice_refresh_task.cancel()
+
+    task_group = None
+
+    await http_session.close()
+    http_session = None
 
     # Close WebRTC connections
     if webrtc_manager:
         for session_id in list(webrtc_manager.pcs.keys()):
             await webrtc_manager.close_peer_connection(session_id)
 
+    # Let executor jobs finish and join its threads (without blocking the loop)
+    await loop.shutdown_default_executor()
+
     logger.info("✅ Server shutdown complete")
 
 
@@ -324,77 +539,163 @@ app.add_middleware(
 # SESSION MANAGEMENT
 # ============================================================================
 
-async def create_session(websocket: WebSocket, user_id: str) -> str:
+async def create_session(
+    websocket: WebSocket, user_id: str, batch_frames: bool = False, binary_frames: bool = False
+) -> str:
     """Create a new voice session."""
-    session_id = str(uuid.uuid4())
-
-    sessions[session_id] = {
-        "user_id": user_id,
-        "websocket": websocket,
-        "is_active": True,
-        "is_speaking": False,
-        "created_at": time.time(),
-    }
+    session_id = secrets.token_hex(16)
 
-    audio_buffers[session_id] = {
-        "chunks": [],
-        "last_chunk_time": time.time(),
-        "processing_task": None,
-    }
+    session = SessionState(
+        user_id=user_id, ws_ref=weakref.ref(websocket),
+        batch_frames=batch_frames, binary_frames=binary_frames,
+    )
+    sessions[session_id] = session
+    session.writer = spawn_task(_write_outbox(session))
+    session.debouncer = spawn_task(_debounce_audio_buffer(session_id, session))
 
     # Initialize LLM session
     if llm_provider:
         llm_provider.create_session(session_id)
 
-    logger.info(f"📞 Session created: {session_id[:8]}...")
+    logger.info("📞 Session created: %.8s...", session_id)
     return session_id
 
 
 async def cleanup_session(session_id: str):
     """Clean up a voice session."""
-    # Cancel active task
-    if session_id in active_tasks:
-        active_tasks[session_id].cancel()
-        del active_tasks[session_id]
-
-    # Clean up audio buffer
-    if session_id in audio_buffers:
-        buffer = audio_buffers[session_id]
-        if buffer.get("processing_task"):
-            buffer["processing_task"].cancel()
-        del audio_buffers[session_id]
+    # Close WebRTC first so the peer connection releases its sockets now,
+    # not whenever it is garbage collected
+    if webrtc_manager:
+        await webrtc_manager.close_peer_connection(session_id)
+
+    # Remove session, then cancel its processing task, debouncer and writer
+    # together and wait for all of them to unwind
+    session = sessions.pop(session_id, None)
+    if session and (tasks := session.tasks()):
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
     # Clean up LLM session
     if llm_provider:
         llm_provider.cleanup_session(session_id)
 
-    # Clean up WebRTC
-    if webrtc_manager and session_id in webrtc_manager.pcs:
-        await webrtc_manager.close_peer_connection(session_id)
-
-    # Remove session
-    sessions.pop(session_id, None)
-
-    logger.info(f"👋 Session cleaned up: {session_id[:8]}...")
+    logger.info("👋 Session cleaned up: %.8s...", session_id)
 
 
 async def send_message(session_id: str, message: dict):
-    """Send a message to a session."""
+    """
+    Queue a message for the session's writer task.
+
+    At most OUTBOX_LIMIT messages are pending. Once a slow client has
+    filled the outbox, droppable events are discarded; any other event
+    first makes room by shedding pending droppable ones, and if there are
+    none, the client is disconnected rather than queued for without bound.
+    """
     session = sessions.get(session_id)
-    if session and session.get("websocket"):
+    if not session or not session.is_active:
+        return
+
+    outbox = session.outbox
+    event = message.get("event")
+
+    if event == "voice_interrupted":
+        # Sentences of the interrupted response are stale; don't make the
+        # interrupt wait behind them
+        _shed_droppable(outbox)
+
+    if len(outbox) >= OUTBOX_LIMIT:
+        if event in DROPPABLE_EVENTS:
+            logger.debug("Outbox full for %.8s, dropping %s", session_id, event)
+            return
+        _shed_droppable(outbox)
+        if len(outbox) >= OUTBOX_LIMIT:
+            logger.warning("⚠️ Outbox overflow for %.8s, closing connection", session_id)
+            _close_stalled(session)
+            return
+
+    outbox.append(message)
+    session.outbox_ready.set()
+
+
+def _shed_droppable(outbox: deque):
+    """Drop pending droppable events, keeping the rest in order."""
+    pending = [m for m in outbox if m.get("event") not in DROPPABLE_EVENTS]
+    outbox.clear()
+    outbox.extend(pending)
+
+
+def _close_stalled(session: SessionState):
+    """
+    Disconnect a client that isn't reading its events.
+
+    The writer is stopped and its backlog discarded; closing the socket
+    ends the receive loop, which cleans up the session.
+    """
+    session.is_active = False
+    session.outbox.clear()
+    if session.writer:
+        session.writer.cancel()
+    websocket = session.websocket
+    if websocket is not None:
+        spawn_task(websocket.close(code=OUTBOX_OVERFLOW_CLOSE_CODE))
+
+
+async def _write_outbox(session: SessionState):
+    """
+    Send queued messages in order, one writer per session.
+
+    After waking, yields once so messages queued in the same loop tick are
+    sent together (as a single frame when the client opted into batching).
+    """
+    outbox = session.outbox
+
+    while True:
+        await session.outbox_ready.wait()
+        await asyncio.sleep(0)
+        session.outbox_ready.clear()
+
+        websocket = session.websocket
+        if websocket is None:
+            # Connection already released; nothing left to write to
+            outbox.clear()
+            return
+
         try:
-            await session["websocket"].send_text(json.dumps(message))
+            if session.batch_frames:
+                messages = list(outbox)
+                outbox.clear()
+                await _send_frame(session, websocket, b"\n".join(map(orjson.dumps, messages)))
+            else:
+                # One at a time, so send_message can still shed what's pending
+                while outbox:
+                    await _send_frame(session, websocket, orjson.dumps(outbox.popleft()))
         except Exception as e:
-            logger.error(f"Failed to send message: {e}")
+            logger.error("Failed to send message: %s", e)
+
+        # Don't pin the connection while idle
+        del websocket
+
+
+async def _send_frame(session: SessionState, websocket: WebSocket, payload: bytes):
+    """Send serialized JSON as a binary frame (as-is) or a text frame."""
+    if session.binary_frames:
+        await websocket.send_bytes(payload)
+    else:
+        await websocket.send_text(payload.decode())
 
 
 # ============================================================================
 # AUDIO PROCESSING (NEW PIPELINE)
 # ============================================================================
 
-async def process_audio(session_id: str, audio_bytes: bytes):
+async def process_audio(session_id: str, segments: asyncio.Queue):
     """
-    Process audio through the pipeline: ASR → LLM (streaming) → TTS → WebRTC
+    Process an utterance through the pipeline: ASR → LLM (streaming) → TTS → WebRTC
+
+    The utterance arrives as audio segments ending with None (several when
+    it was flushed on size). Each is transcribed as soon as it arrives, and
+    the joined transcript is answered as a single turn.
 
     This uses:
     - SentenceAggregator for streaming LLM tokens into sentences
@@ -402,21 +703,13 @@ async def process_audio(session_id: str, audio_bytes: bytes):
     - WebRTC for low-latency audio delivery
     """
     try:
-        # 1. Validate audio
-        is_valid, info = audio_validator.validate_audio(
-            audio_bytes, sample_rate=16000, format="webm"
-        )
-        if not is_valid:
-            logger.info(f"🔇 Audio validation failed: {info.get('reason')}")
-            return
-
-        logger.info(f"✅ Audio validated (energy={info.get('energy', 0):.1f})")
-
-        # 2. ASR: Audio → Text
-        logger.info(f"🎤 Transcribing audio ({len(audio_bytes)} bytes)...")
-        transcript = await asr_provider.transcribe(audio_bytes)
+        transcripts = []
+        while (audio_bytes := await segments.get()) is not None:
+            if transcript := await _transcribe_segment(audio_bytes):
+                transcripts.append(transcript)
+        transcript = " ".join(transcripts)
 
-        if not transcript or len(transcript.strip()) < 2:
+        if len(transcript.strip()) < 2:
             logger.info("🔇 Empty transcript, ignoring")
             await send_message(session_id, {
                 "event": "no_speech_detected",
@@ -424,7 +717,7 @@ async def process_audio(session_id: str, audio_bytes: bytes):
             })
             return
 
-        logger.info(f"📝 Transcript: {transcript}")
+        logger.info("📝 Transcript: %s", transcript)
 
         # Send transcript to frontend
         await send_message(session_id, {
@@ -436,12 +729,72 @@ async def process_audio(session_id: str, audio_bytes: bytes):
         await stream_response(session_id, transcript)
 
     except asyncio.CancelledError:
-        logger.info(f"Processing cancelled for {session_id[:8]}")
+        logger.info("Processing cancelled for %.8s", session_id)
         raise
     except Exception as e:
-        logger.error(f"❌ Error processing audio: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error processing audio: %s", e)
+
+
+async def _transcribe_segment(audio_bytes: bytes) -> Optional[str]:
+    """Validate one audio segment and transcribe it (None if it is skipped)."""
+    # 1. Validate audio (numpy + VAD; keep it off the event loop)
+    is_valid, info = await asyncio.get_running_loop().run_in_executor(
+        None, partial(audio_validator.validate_audio, audio_bytes, sample_rate=16000, format="webm")
+    )
+    if not is_valid:
+        logger.info("🔇 Audio validation failed: %s", info.get('reason'))
+        return
+
+    logger.info("✅ Audio validated (energy=%.1f)", info.get('energy', 0))
+
+    if _is_short_quiet_clip(audio_bytes):
+        return
+
+    # 2. ASR: Audio → Text
+    logger.info("🎤 Transcribing audio (%s bytes)...", len(audio_bytes))
+    return await asr_provider.transcribe(audio_bytes)
+
+
+def _is_short_quiet_clip(audio_bytes: bytes) -> bool:
+    """
+    Whether a clip is shorter than MIN_ASR_DURATION and quieter than
+    ASR_HARD_FLOOR, i.e. a VAD false positive not worth an ASR call.
+
+    Only WAV clips are measured, from their header and samples; a WebM
+    clip's energy is unknown without decoding it, so it always goes to ASR.
+    """
+    if audio_bytes[:4] != b"RIFF":
+        return False
+
+    try:
+        with wave.open(io.BytesIO(audio_bytes)) as wav:
+            duration_s = wav.getnframes() / wav.getframerate()
+    except (wave.Error, EOFError):
+        return False
+    if duration_s >= MIN_ASR_DURATION:
+        return False
+
+    energy = audio_validator.calculate_energy(audio_bytes)
+    if energy >= ASR_HARD_FLOOR:
+        return False
+
+    logger.info("🔇 Skipping ASR: %.0fms clip at energy %.1f", duration_s * 1000, energy)
+    return True
+
+
+async def _process_audio_in_turn(session_id: str, segments: asyncio.Queue):
+    """
+    Process an utterance once any earlier turn of the session is done.
+
+    Keeps two turns from racing on the same LLM conversation; a
+    superseded turn is cancelled, so the wait is just its unwinding.
+    """
+    session = sessions.get(session_id)
+    if not session:
+        return
+
+    async with session.lock:
+        await process_audio(session_id, segments)
 
 
 async def stream_response(session_id: str, user_message: str):
@@ -449,6 +802,8 @@ async def stream_response(session_id: str, user_message: str):
     Stream LLM response through TTS to WebRTC.
 
     Key: Uses SentenceAggregator to start TTS before LLM finishes!
+    Sentences are queued to a TTS task, so synthesis of one sentence
+    overlaps with generation of the next.
     """
     if not llm_provider:
         logger.error("LLM provider not initialized")
@@ -458,48 +813,58 @@ async def stream_response(session_id: str, user_message: str):
     if not session:
         return
 
-    session["is_speaking"] = True
+    speaking = session.speaking
+    speaking.set()
     full_response = ""
 
-    try:
-        logger.info(f"🤖 Streaming LLM response for: {user_message[:50]}...")
-
-        # Stream LLM tokens → aggregate into sentences → TTS each sentence
-        sentence_aggregator.reset()
-
-        async for token in llm_provider.stream(session_id, user_message):
-            # Check for interruption
-            if not session.get("is_speaking", True):
-                logger.info("🛑 Response interrupted")
-                break
-
-            # Aggregate tokens into sentences
-            sentences = sentence_aggregator.add_token(token)
+    # LLM → sentence queue → TTS run as concurrent stages
+    sentence_queue: asyncio.Queue = asyncio.Queue()
 
-            # TTS and stream each complete sentence immediately
-            for sentence in sentences:
-                full_response += sentence + " "
-                logger.info(f"📢 Sentence ready: {sentence[:50]}...")
-
-                # Send sentence event to frontend
+    try:
+        # Leaving the group waits for TTS to finish the queued sentences; on
+        # an error or cancellation, TTS is cancelled and waited for instead
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(_tts_worker(session_id, sentence_queue))
+
+            logger.info("🤖 Streaming LLM response for: %.50s...", user_message)
+
+            # Stream LLM tokens → aggregate into sentences → queue for TTS
+            sentence_aggregator.reset()
+
+            async for token in llm_provider.stream(session_id, user_message):
+                # Check for interruption
+                if not speaking.is_set():
+                    logger.info("🛑 Response interrupted")
+                    break
+
+                # Aggregate tokens into sentences
+                sentences = sentence_aggregator.add_token(token)
+
+                # Hand each complete sentence to TTS immediately
+                for sentence in sentences:
+                    full_response += sentence + " "
+                    logger.info("📢 Sentence ready: %.50s...", sentence)
+
+                    # Send sentence event to frontend
+                    await send_message(session_id, {
+                        "event": "llm_sentence",
+                        "data": {"text": sentence}
+                    })
+
+                    sentence_queue.put_nowait(sentence)
+
+            # Flush remaining text
+            remaining = sentence_aggregator.flush()
+            if remaining and speaking.is_set():
+                full_response += remaining
+                logger.info("📢 Final chunk: %.50s...", remaining)
                 await send_message(session_id, {
                     "event": "llm_sentence",
-                    "data": {"text": sentence}
+                    "data": {"text": remaining}
                 })
+                sentence_queue.put_nowait(remaining)
 
-                # Stream TTS audio for this sentence
-                await stream_tts_to_webrtc(session_id, sentence)
-
-        # Flush remaining text
-        remaining = sentence_aggregator.flush()
-        if remaining and session.get("is_speaking", True):
-            full_response += remaining
-            logger.info(f"📢 Final chunk: {remaining[:50]}...")
-            await send_message(session_id, {
-                "event": "llm_sentence",
-                "data": {"text": remaining}
-            })
-            await stream_tts_to_webrtc(session_id, remaining)
+            sentence_queue.put_nowait(None)
 
         # Send complete response
         full_response = full_response.strip()
@@ -514,75 +879,166 @@ async def stream_response(session_id: str, user_message: str):
             "data": {"session_id": session_id}
         })
 
-        logger.info(f"✅ Response complete: {len(full_response)} chars")
+        logger.info("✅ Response complete: %s chars", len(full_response))
 
     except asyncio.CancelledError:
-        logger.info(f"Response cancelled for {session_id[:8]}")
+        logger.info("Response cancelled for %.8s", session_id)
         raise
     except Exception as e:
-        logger.error(f"❌ Error streaming response: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error streaming response: %s", e)
     finally:
-        session["is_speaking"] = False
+        speaking.clear()
 
 
-async def stream_tts_to_webrtc(session_id: str, text: str):
+async def _tts_worker(session_id: str, sentence_queue: asyncio.Queue):
     """
-    Convert text to speech and stream to WebRTC.
+    Speak queued sentences in order until the None sentinel arrives.
+
+    TTS requests are started up to TTS_PREFETCH sentences ahead of playback,
+    so provider latency overlaps the current sentence's audio. Every sentence
+    of the response is decoded by one FFmpeg process, started with the first
+    sentence; a reader task forwards its PCM to WebRTC. Returns once the
+    decoder has flushed the last of the audio to the track.
 
-    Uses FFmpeg for MP3 → PCM conversion (48kHz for Opus).
+    Providers that already output PCM bypass the decoder.
     """
-    if session_id not in webrtc_manager.tracks:
-        logger.warning(f"No WebRTC track for {session_id[:8]}")
+    session = sessions.get(session_id)
+    if not session:
         return
 
-    session = sessions.get(session_id)
-    if not session or not session.get("is_speaking", True):
+    if session_id not in webrtc_manager.tracks:
+        # Nothing to play the response on: the client never sent a webrtc_offer
+        logger.warning("No WebRTC track for %.8s", session_id)
+        await send_message(session_id, {
+            "event": "error",
+            "data": {
+                "error_type": "webrtc_not_ready",
+                "message": "WebRTC audio channel not established",
+                "session_id": session_id
+            }
+        })
         return
 
+    speaking = session.speaking
+    decoder: Optional[MP3Decoder] = None
+    fetches: list[asyncio.Task] = []
+    prefetched: asyncio.Queue = asyncio.Queue(maxsize=TTS_PREFETCH)
+
     try:
-        # Get TTS audio stream (MP3 chunks)
-        tts_stream = tts_provider.stream_audio(text)
+        async with asyncio.TaskGroup() as tg:
+            prefetcher = tg.create_task(_prefetch_tts(sentence_queue, prefetched, speaking, tg, fetches))
+            reader = None
+
+            while (audio := await prefetched.get()) is not None:
+                if not speaking.is_set():
+                    break
+
+                if tts_provider.output_format == "pcm":
+                    while (pcm_chunk := await audio.get()) is not None:
+                        await webrtc_manager.push_audio_chunk(session_id, pcm_chunk)
+                    continue
+
+                if decoder is None:
+                    decoder = await audio_converter.open_mp3_decoder()
+                    reader = tg.create_task(_push_decoded_pcm(session_id, session, decoder))
+
+                while (mp3_chunk := await audio.get()) is not None:
+                    await decoder.write(mp3_chunk)
+
+            # After an interrupt, stop requesting audio nobody will hear
+            # (no-ops once every sentence has been played)
+            prefetcher.cancel()
+            for fetch in fetches:
+                fetch.cancel()
+
+            # Let FFmpeg flush the tail of the last sentence
+            if decoder:
+                decoder.finish()
+                await reader
+
+    except Exception as e:
+        logger.error("❌ TTS streaming error: %s", e)
+    finally:
+        if decoder:
+            await decoder.kill()
+
+
+async def _prefetch_tts(
+    sentence_queue: asyncio.Queue,
+    prefetched: asyncio.Queue,
+    speaking: asyncio.Event,
+    tg: asyncio.TaskGroup,
+    fetches: list,
+):
+    """
+    Start a TTS request per sentence and hand its audio queue to the worker.
 
-        # Convert MP3 → PCM using FFmpeg and push to WebRTC
-        async for pcm_chunk in audio_converter.mp3_to_pcm_stream(tts_stream):
+    Blocks once TTS_PREFETCH sentences are waiting to be played.
+    """
+    while (sentence := await sentence_queue.get()) is not None:
+        if not speaking.is_set():
+            break
+        audio: asyncio.Queue = asyncio.Queue()
+        fetches.append(tg.create_task(_fetch_tts(sentence, audio, speaking)))
+        await prefetched.put(audio)
+
+    await prefetched.put(None)
+
+
+async def _fetch_tts(text: str, audio: asyncio.Queue, speaking: asyncio.Event):
+    """Stream one sentence's TTS audio into a queue, ending it with None."""
+    try:
+        async for chunk in tts_provider.stream_audio(text):
             # Check for interruption
-            if not session.get("is_speaking", True):
+            if not speaking.is_set():
                 break
+            audio.put_nowait(chunk)
+
+    except Exception as e:
+        logger.error("❌ TTS streaming error: %s", e)
+    finally:
+        audio.put_nowait(None)
 
-            # Push PCM to WebRTC track
-            await webrtc_manager.push_audio_chunk(session_id, pcm_chunk)
+
+async def _push_decoded_pcm(session_id: str, session: SessionState, decoder: MP3Decoder):
+    """Push PCM from the decoder to the WebRTC track until FFmpeg exits."""
+    speaking = session.speaking
+    try:
+        while pcm_chunk := await decoder.read():
+            # Drop audio that will never be played (interrupt)
+            if speaking.is_set():
+                await webrtc_manager.push_audio_chunk(session_id, pcm_chunk)
 
     except Exception as e:
-        logger.error(f"❌ TTS streaming error: {e}")
+        logger.error("❌ WebRTC push error: %s", e)
 
 
 # ============================================================================
 # INTERRUPTION HANDLING
 # ============================================================================
 
-async def handle_interrupt(session_id: str):
+async def handle_interrupt(session_id: str, data: Optional[dict] = None):
     """Handle user interruption - stop current response immediately."""
-    logger.warning(f"🛑 Interrupt received for {session_id[:8]}...")
+    logger.warning("🛑 Interrupt received for %.8s...", session_id)
 
     session = sessions.get(session_id)
     if session:
-        session["is_speaking"] = False
+        session.speaking.clear()
 
-    # Cancel active processing task
-    if session_id in active_tasks:
-        active_tasks[session_id].cancel()
-        del active_tasks[session_id]
+        # Cancel active processing task (and close its turn)
+        if session.active_task:
+            session.active_task.cancel()
+            session.active_task = None
+        session.segments = None
 
     # Flush WebRTC track
     if webrtc_manager and session_id in webrtc_manager.tracks:
         try:
             await webrtc_manager.tracks[session_id].flush()
             await webrtc_manager.replace_audio_track(session_id)
-            logger.info(f"🧹 Flushed WebRTC track for {session_id[:8]}")
+            logger.info("🧹 Flushed WebRTC track for %.8s", session_id)
         except Exception as e:
-            logger.error(f"Error flushing track: {e}")
+            logger.error("Error flushing track: %s", e)
 
     # Notify frontend
     await send_message(session_id, {
@@ -601,56 +1057,124 @@ async def handle_audio_chunk(session_id: str, data: dict):
     if not audio_data:
         return
 
-    audio_bytes = base64.b64decode(audio_data)
-
-    if session_id not in audio_buffers:
+    session = sessions.get(session_id)
+    if not session:
         return
 
-    buffer = audio_buffers[session_id]
-    buffer["chunks"].append(audio_bytes)
-    buffer["last_chunk_time"] = time.time()
+    # a2b_base64 takes the ASCII str as-is (no .encode()) and skips the
+    # base64 module's Python-level wrapper
+    _buffer_audio(session, binascii.a2b_base64(audio_data))
 
-    logger.debug(f"🎤 Buffered chunk ({len(audio_bytes)} bytes), total: {len(buffer['chunks'])}")
 
-    # Cancel existing processing task
-    if buffer["processing_task"] and not buffer["processing_task"].done():
-        buffer["processing_task"].cancel()
+async def handle_audio_chunks_batch(session_id: str, data: dict):
+    """Handle several base64 audio chunks sent in one message."""
+    chunks = data.get("chunks")
+    if not chunks:
+        return
 
-    # Schedule processing after timeout
-    buffer["processing_task"] = asyncio.create_task(
-        _process_buffer_after_timeout(session_id)
-    )
+    session = sessions.get(session_id)
+    if not session:
+        return
 
+    # Chunks are padded individually, so decode each, then buffer once
+    audio_bytes = b"".join(map(binascii.a2b_base64, chunks))
+    if audio_bytes:
+        _buffer_audio(session, audio_bytes)
 
-async def _process_buffer_after_timeout(session_id: str):
-    """Process audio buffer after timeout."""
-    try:
-        await asyncio.sleep(BUFFER_TIMEOUT)
 
-        if session_id not in audio_buffers:
-            return
+def _buffer_audio(session: SessionState, audio_bytes: bytes):
+    """Append raw audio to the session buffer and wake the debouncer if needed."""
+    # An empty chunk would count as a segment start without any audio
+    if not audio_bytes:
+        return
 
-        buffer = audio_buffers[session_id]
-        chunks = buffer["chunks"]
+    session.buffer += audio_bytes
+    session.chunk_count += 1
+    session.last_chunk_time = time.monotonic()
 
-        if not chunks:
-            return
+    logger.debug("🎤 Buffered chunk (%s bytes), total: %s", len(audio_bytes), session.chunk_count)
 
-        logger.info(f"🎙️ Processing {len(chunks)} audio chunks...")
+    # The debouncer re-reads last_chunk_time on its own; only wake it to
+    # start a segment or to flush early
+    if len(session.buffer) >= FLUSH_BYTES:
+        session.flush_now = True
+        session.chunk_event.set()
+    elif session.chunk_count == 1:
+        session.chunk_event.set()
 
-        # Combine chunks
-        combined_audio = b''.join(chunks)
-        buffer["chunks"] = []
 
-        # Process through pipeline
-        task = asyncio.create_task(process_audio(session_id, combined_audio))
-        active_tasks[session_id] = task
-        await task
+async def _debounce_audio_buffer(session_id: str, session: SessionState):
+    """
+    Process the audio buffer once no chunk has arrived for BUFFER_TIMEOUT,
+    or immediately once FLUSH_BYTES have been buffered.
+
+    One long-lived task per session (started in create_session). It sleeps
+    until BUFFER_TIMEOUT past the last chunk, then re-reads last_chunk_time
+    to see whether more audio came in meanwhile.
+    """
+    chunk_event = session.chunk_event
+
+    try:
+        while True:
+            # Idle until the first chunk of a new segment
+            await chunk_event.wait()
+            chunk_event.clear()
+
+            # New speech supersedes a response still in flight (but not a
+            # turn whose utterance is still open after a size flush)
+            if session.active_task and session.segments is None:
+                session.active_task.cancel()
+                session.active_task = None
+
+            while not session.flush_now:
+                remaining = session.last_chunk_time + BUFFER_TIMEOUT - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    # Woken early only by a flush request
+                    async with asyncio.timeout(remaining):
+                        await chunk_event.wait()
+                except TimeoutError:
+                    pass
+                chunk_event.clear()
+
+            _process_buffer(session_id, session)
 
     except asyncio.CancelledError:
         pass
+
+
+def _process_buffer(session_id: str, session: SessionState):
+    """Hand the buffered audio to the pipeline and clear the buffer."""
+    try:
+        if not session.buffer:
+            # Nothing to process, but re-arm for the next segment's start
+            session.chunk_count = 0
+            session.flush_now = False
+            return
+
+        logger.info("🎙️ Processing %s audio chunks...", session.chunk_count)
+
+        # One copy out; the buffer is reused for the next segment while
+        # this one is still being transcribed
+        combined_audio = bytes(session.buffer)
+        session.buffer.clear()
+        session.chunk_count = 0
+        # Flushed on size: the utterance goes on, keep its turn open
+        utterance_open = session.flush_now
+        session.flush_now = False
+
+        # Continue the open turn, or start one (through the pipeline)
+        if session.segments is None or not session.active_task or session.active_task.done():
+            session.segments = asyncio.Queue()
+            session.active_task = spawn_task(_process_audio_in_turn(session_id, session.segments))
+        session.segments.put_nowait(combined_audio)
+        if not utterance_open:
+            session.segments.put_nowait(None)
+            session.segments = None
+
     except Exception as e:
-        logger.error(f"❌ Error processing buffer: {e}")
+        logger.error("❌ Error processing buffer: %s", e)
 
 
 async def handle_webrtc_offer(session_id: str, data: dict):
@@ -663,8 +1187,11 @@ async def handle_webrtc_offer(session_id: str, data: dict):
         logger.error("No SDP in offer")
         return
 
-    # Get ICE servers
-    ice_servers = await fetch_ice_servers(session_id)
+    # Same ICE servers the client was given in the welcome
+    session = sessions.get(session_id)
+    ice_servers = session and session.ice_servers
+    if not ice_servers:
+        ice_servers = await fetch_ice_servers(session_id)
 
     # Create answer
     answer = await webrtc_manager.handle_offer(session_id, sdp, type_, ice_servers=ice_servers)
@@ -674,7 +1201,7 @@ async def handle_webrtc_offer(session_id: str, data: dict):
             "event": "webrtc_answer",
             "data": {"sdp": answer["sdp"], "type": answer["type"], "session_id": session_id}
         })
-        logger.info(f"✅ Sent WebRTC answer for {session_id[:8]}")
+        logger.info("✅ Sent WebRTC answer for %.8s", session_id)
 
 
 async def handle_webrtc_ice_candidate(session_id: str, data: dict):
@@ -684,6 +1211,22 @@ async def handle_webrtc_ice_candidate(session_id: str, data: dict):
         await webrtc_manager.handle_ice_candidate(session_id, data)
 
 
+async def handle_heartbeat(session_id: str, data: dict):
+    """Handle client heartbeat (keeps the connection alive, nothing to do)."""
+    logger.debug("💓 Heartbeat from %.8s", session_id)
+
+
+# event name -> handler(session_id, data)
+EVENT_HANDLERS = {
+    "audio_chunk": handle_audio_chunk,
+    "audio_chunks_batch": handle_audio_chunks_batch,
+    "interrupt": handle_interrupt,
+    "webrtc_offer": handle_webrtc_offer,
+    "webrtc_ice_candidate": handle_webrtc_ice_candidate,
+    "heartbeat": handle_heartbeat,
+}
+
+
 # ============================================================================
 # HTTP ENDPOINTS
 # ============================================================================
@@ -733,13 +1276,18 @@ async def debug_audio():
             }
         }
 
+    # get_version() shells out to `ffmpeg -version`
+    version = None
+    if audio_converter:
+        version = await asyncio.get_running_loop().run_in_executor(None, audio_converter.get_version)
+
     return {
         "ffmpeg": {
             "available": audio_converter.is_available() if audio_converter else False,
-            "version": audio_converter.get_version() if audio_converter else None,
+            "version": version,
         },
         "webrtc": webrtc_info,
-        "sessions": {sid[:8]: {"is_speaking": s.get("is_speaking")} for sid, s in sessions.items()},
+        "sessions": {sid[:8]: {"is_speaking": s.speaking.is_set()} for sid, s in sessions.items()},
     }
 
 
@@ -754,15 +1302,24 @@ async def websocket_endpoint(websocket: WebSocket):
 
     try:
         user_id = websocket.query_params.get("user_id", "anonymous")
+        # ?batch=1: client parses newline-delimited JSON frames
+        batch_frames = websocket.query_params.get("batch") == "1"
+        # ?binary=1: client decodes binary frames (TextDecoder + JSON.parse)
+        binary_frames = websocket.query_params.get("binary") == "1"
+        # ?raw_audio=1: client sends audio as binary frames, events as text
+        raw_audio = websocket.query_params.get("raw_audio") == "1"
         await websocket.accept()
         logger.info("📞 WebSocket connection accepted")
 
         # Create session
-        session_id = await create_session(websocket, user_id)
+        session_id = await create_session(
+            websocket, user_id, batch_frames=batch_frames, binary_frames=binary_frames
+        )
+        session = sessions[session_id]
 
         # Fetch ICE servers and send welcome
         # NOTE: Frontend expects "connected" event (not "session_started")
-        ice_servers = await fetch_ice_servers(session_id)
+        ice_servers = session.ice_servers = await fetch_ice_servers(session_id)
         await send_message(session_id, {
             "event": "connected",
             "data": {
@@ -774,27 +1331,44 @@ async def websocket_endpoint(websocket: WebSocket):
 
         # Message loop
         while True:
-            message = await websocket.receive_text()
-            data = json.loads(message)
-            event = data.get("event")
-
-            if event == "audio_chunk":
-                await handle_audio_chunk(session_id, data.get("data", data))
-            elif event == "interrupt":
-                await handle_interrupt(session_id)
-            elif event == "webrtc_offer":
-                await handle_webrtc_offer(session_id, data.get("data", data))
-            elif event == "webrtc_ice_candidate":
-                await handle_webrtc_ice_candidate(session_id, data.get("data", data))
-            elif event == "heartbeat":
-                pass
-            else:
-                logger.warning(f"Unknown event: {event}")
+            # Parse text or binary frames straight from the raw payload
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if raw_audio and message.get("bytes") is not None:
+                # Raw webm chunk: no base64 inflation, no decode pass.
+                # MediaRecorder emits empty blobs now and then; drop them
+                if message["bytes"]:
+                    _buffer_audio(session, message["bytes"])
+                continue
+            payload = message.get("bytes")
+            if payload is None:
+                payload = message.get("text")
+            if not payload:
+                continue
+            # One bad frame is logged and skipped, not fatal to the session
+            try:
+                data = orjson.loads(payload)
+            except (orjson.JSONDecodeError, TypeError) as e:
+                logger.warning("Dropping malformed frame: %s", e)
+                continue
+            # A JSON array frame carries several events, handled in order
+            for item in data if isinstance(data, list) else (data,):
+                if not isinstance(item, dict):
+                    logger.warning("Dropping non-object event: %.50r", item)
+                    continue
+                event = item.get("event")
+
+                handler = EVENT_HANDLERS.get(event)
+                if handler:
+                    await handler(session_id, item.get("data", item))
+                else:
+                    logger.warning("Unknown event: %s", event)
 
     except WebSocketDisconnect:
         logger.info("🔌 WebSocket disconnected")
     except Exception as e:
-        logger.error(f"❌ WebSocket error: {e}")
+        logger.error("❌ WebSocket error: %s", e)
     finally:
         if session_id:
             await cleanup_session(session_id)
@@ -805,11 +1379,18 @@ async def websocket_endpoint(websocket: WebSocket):
 # ============================================================================
 
 if __name__ == "__main__":
+    import importlib.util
     import uvicorn
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        # uvloop/httptools come with uvicorn[standard] (uvloop: not on Windows)
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools",
+        ws="websockets",
+        workers=1,
+        reload=os.environ.get("ENVIRONMENT") != "production",
         log_level="info"
     )
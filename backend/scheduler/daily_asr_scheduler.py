@@ -6,8 +6,7 @@ Sends an audio sample to the HuggingFace ASR API every day.
 
 import asyncio
 import logging
-import os
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 from pathlib import Path
 
 from lib.voice_streaming_framework.asr.hf_space import HFSpaceASR
@@ -62,15 +61,12 @@ class DailyASRScheduler:
         now = datetime.now()
         target = datetime.combine(now.date(), self.run_time)
 
-        if now.time() >= self.run_time:
-            # Already passed today, schedule for tomorrow
-            target = datetime.combine(
-                now.date().replace(day=now.day + 1),
-                self.run_time
-            )
+        if target <= now:
+            # Already passed today, schedule for tomorrow (timedelta rolls
+            # over month and year ends, unlike date.replace(day=day + 1))
+            target += timedelta(days=1)
 
-        delta = target - now
-        return delta.total_seconds()
+        return (target - now).total_seconds()
 
     async def run_once(self) -> str:
         """Run the transcription once immediately."""
@@ -137,4 +133,9 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
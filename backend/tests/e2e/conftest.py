@@ -10,10 +10,21 @@ Provides common test fixtures including:
 
 import pytest
 import json
-import base64
+import queue
+import re
+import time
+import threading
+import orjson
+import binascii
+import functools
+import concurrent.futures
+import importlib.util
+import os
+from contextlib import ExitStack
 from pathlib import Path
-from typing import AsyncGenerator
+from typing import AsyncGenerator, NamedTuple
 from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
 from httpx import AsyncClient
 import asyncio
 
@@ -32,7 +43,7 @@ def audio_metadata(fixtures_dir):
         return json.load(f)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_audio_chinese(fixtures_dir):
     """Load Chinese test audio."""
     audio_path = fixtures_dir / "test_hello_chinese.mp3"
@@ -40,7 +51,7 @@ def test_audio_chinese(fixtures_dir):
         return f.read()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_audio_english(fixtures_dir):
     """Load English test audio."""
     audio_path = fixtures_dir / "test_hello_english.mp3"
@@ -48,7 +59,7 @@ def test_audio_english(fixtures_dir):
         return f.read()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_audio_query(fixtures_dir):
     """Load query test audio."""
     audio_path = fixtures_dir / "test_query_schedule.mp3"
@@ -56,7 +67,7 @@ def test_audio_query(fixtures_dir):
         return f.read()
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def app():
     """Get FastAPI app instance."""
     # Import here to avoid circular imports
@@ -67,11 +78,188 @@ def app():
     return app
 
 
-@pytest.fixture
+# PYTEST_FAST=1 swaps ASR, LLM and TTS for instant stubs: event flow is
+# still exercised end to end, without network calls or synthesis
+FAST_MODE = os.environ.get("PYTEST_FAST") == "1"
+
+
+class StubASR:
+    """Transcribes every segment to the same text."""
+
+    async def transcribe(self, audio_bytes: bytes) -> str:
+        return "hello"
+
+
+class StubLLM:
+    """Streams a fixed one-sentence reply."""
+
+    def create_session(self, session_id: str):
+        pass
+
+    def cleanup_session(self, session_id: str):
+        pass
+
+    async def stream(self, session_id: str, user_message: str):
+        for token in ("Hello", " there", "."):
+            yield token
+
+
+class StubTTS:
+    """Speaks every sentence as three 20ms frames of PCM silence."""
+
+    output_format = "pcm"
+
+    async def stream_audio(self, text: str):
+        for _ in range(3):
+            yield bytes(1920)
+
+
+# Run the app on uvloop, like the server does, where it is installed
+# (uvloop/httptools come with uvicorn[standard]; uvloop: not on Windows)
+TEST_LOOP_OPTIONS = {"use_uvloop": True} if importlib.util.find_spec("uvloop") else {}
+
+
+@pytest.fixture(scope="session")
 def sync_client(app):
-    """Create synchronous test client for WebSocket testing."""
-    with TestClient(app) as client:
-        yield client
+    """
+    Create synchronous test client for WebSocket testing.
+
+    Shared by the whole session (the app lifespan runs once); every test
+    still opens its own WebSocket, so sessions stay isolated. In FAST_MODE
+    the providers are stubbed once startup has created the real ones.
+    """
+    with TestClient(app, backend_options=TEST_LOOP_OPTIONS) as client:
+        if not FAST_MODE:
+            yield client
+            return
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr("main.asr_provider", StubASR())
+            mp.setattr("main.llm_provider", StubLLM())
+            mp.setattr("main.tts_provider", StubTTS())
+            yield client
+
+
+@pytest.fixture(scope="session")
+def health_snapshot(sync_client):
+    """
+    One /health response for the whole session.
+
+    Component status doesn't change while the app is up; tests that need
+    live values (e.g. active_sessions) call the endpoint themselves.
+    """
+    return sync_client.get("/health")
+
+
+@pytest.fixture(scope="session")
+def root_snapshot(sync_client):
+    """One / response for the whole session (service info is static)."""
+    return sync_client.get("/")
+
+
+@pytest.fixture(scope="class")
+def shared_ws(sync_client):
+    """
+    Open one WebSocket session for a whole test class.
+
+    Yields (websocket, session_id). Only for tests that send nothing the
+    server answers, since events left unread would reach the next test;
+    tests that do, or that assert connect-time behavior, open their own.
+    """
+    with sync_client.websocket_connect("/ws?user_id=diag_shared") as websocket:
+        yield websocket, read_session_id(websocket)
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "no_pool: give pooled_ws a fresh connection instead of a pooled one"
+    )
+
+
+class PooledWebSocket(NamedTuple):
+    """An open WebSocket with its "connected" event already consumed."""
+
+    websocket: object
+    session_id: str
+    ice_servers: list
+    user_id: str
+
+
+class WebSocketPool:
+    """
+    Open WebSocket sessions, leased to tests and returned for reuse.
+
+    Idle connections are kept per user_id. Each one's "connected" event is
+    read once, when it is opened, and its session_id and ice_servers are
+    cached on the lease. Only return connections whose server-side state
+    the test left as it found it.
+    """
+
+    def __init__(self, client: TestClient):
+        self._client = client
+        self._idle: dict[str, queue.Queue] = {}
+        self._stack = ExitStack()
+
+    def connect(self, user_id: str, stack: ExitStack) -> PooledWebSocket:
+        """Open a new connection, outside the pool; `stack` closes it."""
+        websocket = stack.enter_context(
+            self._client.websocket_connect(f"/ws?user_id={user_id}")
+        )
+        connect_msg = websocket.receive_json()
+        return PooledWebSocket(
+            websocket,
+            connect_msg["data"]["session_id"],
+            connect_msg["data"]["ice_servers"],
+            user_id,
+        )
+
+    def acquire(self, user_id: str) -> PooledWebSocket:
+        """Lease an idle connection for user_id, opening one if none is free."""
+        try:
+            return self._idle.setdefault(user_id, queue.Queue()).get_nowait()
+        except queue.Empty:
+            return self.connect(user_id, self._stack)
+
+    def release(self, conn: PooledWebSocket):
+        """Return a leased connection to the pool."""
+        self._idle[conn.user_id].put_nowait(conn)
+
+    def close(self):
+        """Close every connection the pool opened."""
+        self._stack.close()
+        self._idle.clear()
+
+
+# Keeps user_ids distinct across pytest-xdist workers ("" when not under xdist)
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "")
+
+# user_id for pooled connections: tests only need "a connected session"
+POOL_USER_ID = f"test_pool{XDIST_WORKER}"
+
+
+@pytest.fixture(scope="session")
+def ws_pool(sync_client):
+    """Session-wide WebSocket pool, warmed with one POOL_USER_ID connection."""
+    pool = WebSocketPool(sync_client)
+    pool.release(pool.acquire(POOL_USER_ID))
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def pooled_ws(request, ws_pool):
+    """
+    A connected session for one test, leased from ws_pool.
+
+    Tests marked no_pool (those that change the session's state, e.g. by
+    negotiating WebRTC) get a fresh connection, closed afterwards.
+    """
+    if request.node.get_closest_marker("no_pool"):
+        with ExitStack() as stack:
+            yield ws_pool.connect(f"{request.node.name}{XDIST_WORKER}", stack)
+        return
+    conn = ws_pool.acquire(POOL_USER_ID)
+    yield conn
+    ws_pool.release(conn)
 
 
 class MockWebRTCConnection:
@@ -83,14 +271,15 @@ class MockWebRTCConnection:
         self.remote_description = None
         self.ice_candidates = []
         self.audio_chunks = []
-
-    def create_offer(self):
-        """Create mock WebRTC offer."""
-        return {
+        self._offer = {
             "sdp": f"mock-sdp-offer-{self.session_id}",
             "type": "offer"
         }
 
+    def create_offer(self):
+        """Create mock WebRTC offer (a copy; callers may mutate it)."""
+        return dict(self._offer)
+
     def set_remote_description(self, sdp: str, type: str):
         """Set remote description."""
         self.remote_description = {"sdp": sdp, "type": type}
@@ -104,7 +293,7 @@ class MockWebRTCConnection:
         self.audio_chunks.append(chunk)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_webrtc():
     """Create mock WebRTC connection."""
     def _create_mock(session_id: str):
@@ -112,6 +301,29 @@ def mock_webrtc():
     return _create_mock
 
 
+@pytest.fixture(scope="session")
+def cached_offer(mock_webrtc):
+    """
+    One mock offer for the whole session, as (sdp_template, type).
+
+    Fill in the session with sdp_template.replace(session_id_placeholder,
+    session_id); tests that go on to set_remote_description use mock_webrtc.
+    """
+    offer = mock_webrtc(SESSION_ID_PLACEHOLDER).create_offer()
+    return offer["sdp"], offer["type"]
+
+
+@functools.lru_cache(maxsize=None)
+def _encoded_chunks(audio_data: bytes, chunk_size: int) -> tuple:
+    """Base64 chunks of audio_data, computed once per (audio, chunk_size)."""
+    # memoryview slices are zero-copy; b2a_base64 encodes them directly
+    view = memoryview(audio_data)
+    return tuple(
+        binascii.b2a_base64(view[i:i + chunk_size], newline=False).decode('ascii')
+        for i in range(0, len(audio_data), chunk_size)
+    )
+
+
 def encode_audio_chunk(audio_data: bytes, chunk_size: int = 4096):
     """
     Split audio into chunks and encode as base64.
@@ -123,17 +335,227 @@ def encode_audio_chunk(audio_data: bytes, chunk_size: int = 4096):
     Yields:
         Base64 encoded audio chunks
     """
-    for i in range(0, len(audio_data), chunk_size):
-        chunk = audio_data[i:i + chunk_size]
-        yield base64.b64encode(chunk).decode('utf-8')
+    yield from _encoded_chunks(audio_data, chunk_size)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def audio_encoder():
     """Get audio encoder function."""
     return encode_audio_chunk
 
 
+# Stands in for session_id in pre-encoded frames; not valid base64 or hex
+SESSION_ID_PLACEHOLDER = "__SID__"
+
+
+def _audio_chunk_frames(audio_data: bytes, chunk_size: int) -> tuple[str, ...]:
+    """Serialize audio_chunk events once, with a placeholder session_id."""
+    return tuple(
+        orjson.dumps({
+            "event": "audio_chunk",
+            "session_id": SESSION_ID_PLACEHOLDER,
+            "data": {"audio": chunk}
+        }).decode()
+        for chunk in _encoded_chunks(audio_data, chunk_size)
+    )
+
+
+@pytest.fixture(scope="session")
+def session_id_placeholder():
+    """Get the session_id placeholder used in pre-encoded frames."""
+    return SESSION_ID_PLACEHOLDER
+
+
+@pytest.fixture(scope="session")
+def preencoded_chinese_frames(test_audio_chinese):
+    """
+    Chinese test audio as ready-to-send audio_chunk frames (4096-byte chunks).
+
+    Fill in the session with frame.replace(session_id_placeholder, session_id).
+    """
+    return _audio_chunk_frames(test_audio_chinese, 4096)
+
+
+@pytest.fixture(scope="session")
+def preencoded_chinese_batch(test_audio_chinese):
+    """Chinese test audio as one audio_chunks_batch frame (4096-byte chunks)."""
+    return orjson.dumps({
+        "event": "audio_chunks_batch",
+        "session_id": SESSION_ID_PLACEHOLDER,
+        "data": {"chunks": _encoded_chunks(test_audio_chinese, 4096)}
+    }).decode()
+
+
+@pytest.fixture(scope="session")
+def preencoded_query_frames(test_audio_query):
+    """Query test audio as ready-to-send audio_chunk frames (2048-byte chunks)."""
+    return _audio_chunk_frames(test_audio_query, 2048)
+
+
+# websocket -> Future of a receive_text() that timed out and is still waiting
+_pending_receives: dict = {}
+
+
+def _receive_text(websocket, timeout: float) -> str:
+    """
+    receive_text() that raises TimeoutError after `timeout` seconds.
+
+    TestClient WebSockets only block, so the receive runs on a daemon
+    thread. One that times out stays pending and is picked up by the next
+    call on the same socket, so the message it gets isn't lost.
+    """
+    future = _pending_receives.pop(websocket, None)
+    if future is None:
+        future = concurrent.futures.Future()
+
+        def _receive():
+            try:
+                future.set_result(websocket.receive_text())
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=_receive, daemon=True).start()
+
+    try:
+        return future.result(timeout)
+    except TimeoutError:
+        _pending_receives[websocket] = future
+        raise
+
+
+def receive_event(websocket, timeout: float = 2.0) -> dict:
+    """
+    Receive and parse the next event from a TestClient WebSocket.
+
+    Unlike receive_text(), which blocks until a message arrives, this
+    raises TimeoutError after `timeout` seconds of silence.
+    """
+    return orjson.loads(_receive_text(websocket, timeout))
+
+
+# Seconds each event may take to arrive, so a regression fails fast
+# instead of sitting out one blanket timeout
+EVENT_TIMEOUTS = {
+    "webrtc_answer": 5,
+    "transcript": 5,
+    "agent_response": 10,
+    "streaming_complete": 10,
+    "voice_interrupted": 5,
+    "error": 5,
+}
+
+
+def _default_timeout(events) -> float:
+    """Time to allow when waiting for any of `events`: the slowest one's budget."""
+    return max(EVENT_TIMEOUTS[event] for event in events)
+
+
+def collect_until(websocket, terminal_events, timeout: float | None = None) -> list[dict]:
+    """
+    Receive events until one of terminal_events arrives (it is included).
+
+    Stops early, returning what it has, if the socket closes or `timeout`
+    seconds pass in total (default: from EVENT_TIMEOUTS).
+    """
+    if timeout is None:
+        timeout = _default_timeout(terminal_events)
+    messages = []
+    deadline = time.monotonic() + timeout
+    while (remaining := deadline - time.monotonic()) > 0:
+        try:
+            msg = receive_event(websocket, remaining)
+        except (TimeoutError, WebSocketDisconnect):
+            break
+        messages.append(msg)
+        if msg["event"] in terminal_events:
+            break
+    return messages
+
+
+def wait_for_event(websocket, events, timeout: float | None = None) -> dict | None:
+    """
+    Skip ahead to the first event named in `events` and return it.
+
+    Returns None if the socket closes or `timeout` seconds (default: from
+    EVENT_TIMEOUTS) pass first. Frames are screened for the serialized
+    '"event":"<name>"' marker, so the events skipped over are never parsed.
+    """
+    if timeout is None:
+        timeout = _default_timeout(events)
+    markers = [f'"event":"{name}"' for name in events]
+    deadline = time.monotonic() + timeout
+    while (remaining := deadline - time.monotonic()) > 0:
+        try:
+            text = _receive_text(websocket, remaining)
+        except (TimeoutError, WebSocketDisconnect):
+            return None
+        if any(marker in text for marker in markers):
+            msg = orjson.loads(text)
+            # The marker could also sit inside a string value
+            if msg["event"] in events:
+                return msg
+    return None
+
+
+def send_batch(websocket, messages: list[dict]):
+    """Send several events in one frame, as a JSON array (handled in order)."""
+    websocket.send_text(orjson.dumps(messages).decode())
+
+
+# Server session IDs are secrets.token_hex(16)
+SESSION_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+
+def read_session_id(websocket) -> str:
+    """
+    Receive the "connected" event and return its session_id.
+
+    Matches the field directly instead of parsing the whole payload
+    (ice_servers and all); tests needing other fields parse the event.
+    """
+    text = websocket.receive_text()
+    key = text.find('"session_id"')
+    match = SESSION_ID_RE.search(text, key) if key >= 0 else None
+    assert match, f"No session_id in connect message: {text[:200]}"
+    return match.group()
+
+
+@pytest.fixture
+def session_id_reader():
+    """Get session ID reader function."""
+    return read_session_id
+
+
+@pytest.fixture
+def session_id_pattern():
+    """Get the compiled pattern server session IDs match."""
+    return SESSION_ID_RE
+
+
+@pytest.fixture
+def event_receiver():
+    """Get timed event receive function."""
+    return receive_event
+
+
+@pytest.fixture
+def event_collector():
+    """Get bounded event collection function."""
+    return collect_until
+
+
+@pytest.fixture
+def event_waiter():
+    """Get skip-ahead event wait function."""
+    return wait_for_event
+
+
+@pytest.fixture
+def batch_sender():
+    """Get one-frame batch send function."""
+    return send_batch
+
+
 @pytest.fixture
 def sample_websocket_message():
     """Create sample WebSocket message."""
@@ -7,6 +7,7 @@
 #   --fast    Skip test audio generation
 #   --cov     Run with coverage report
 #   --debug   Enable debug logging
+#   --parallel  Run tests across CPU cores (pytest-xdist)
 
 set -e
 
@@ -20,6 +21,7 @@ echo ""
 SKIP_AUDIO=false
 WITH_COVERAGE=false
 DEBUG_MODE=false
+PARALLEL=false
 
 for arg in "$@"; do
     case $arg in
@@ -32,6 +34,9 @@ for arg in "$@"; do
         --debug)
             DEBUG_MODE=true
             ;;
+        --parallel)
+            PARALLEL=true
+            ;;
         *)
             echo "Unknown option: $arg"
             exit 1
@@ -63,7 +68,16 @@ if [ "$DEBUG_MODE" = true ]; then
     PYTEST_ARGS="$PYTEST_ARGS --log-cli-level=DEBUG"
 fi
 
-uv run pytest $PYTEST_ARGS
+UV_ARGS=""
+
+# Each xdist worker is its own process with its own app instance, and every
+# test uses its own user_id, so tests don't share server state
+if [ "$PARALLEL" = true ]; then
+    UV_ARGS="--with pytest-xdist"
+    PYTEST_ARGS="$PYTEST_ARGS -n auto"
+fi
+
+uv run $UV_ARGS pytest $PYTEST_ARGS
 
 echo ""
 echo "✅ All E2E tests completed!"
@@ -0,0 +1,165 @@
+"""
+E2E tests for server-side audio buffering.
+
+Checks that every buffered segment reaches the turn pipeline: segments
+flushed early on size (as one turn), and audio that follows empty chunks.
+The pipeline itself is replaced by a recorder, so no ASR, LLM or TTS is
+involved.
+"""
+
+import os
+import time
+import base64
+import asyncio
+import logging
+import pytest
+
+log = logging.getLogger(__name__)
+
+# Keeps user_ids distinct across pytest-xdist workers ("" when not under xdist)
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "")
+
+# Small limits, so a test fits a few size flushes in well under a second
+BUFFER_TIMEOUT = 0.3
+FLUSH_BYTES = 1000
+
+# How long each segment of a recorded turn takes: long enough that a
+# wrongful cancel (e.g. by the next chunk) lands while the turn is running
+TURN_TIME = 0.2
+
+
+@pytest.fixture
+def processed_turns(sync_client, monkeypatch):
+    """
+    Record each turn's segments, in place of the real pipeline.
+
+    A turn is recorded only once it finishes, so one cancelled on the way
+    (superseded or interrupted) never shows up.
+    """
+    import main
+
+    turns = []
+
+    async def _record_turn(session_id: str, segments: asyncio.Queue):
+        turn = []
+        while (audio_bytes := await segments.get()) is not None:
+            await asyncio.sleep(TURN_TIME)
+            turn.append(audio_bytes)
+        turns.append(turn)
+
+    monkeypatch.setattr(main, "_process_audio_in_turn", _record_turn)
+    monkeypatch.setattr(main, "BUFFER_TIMEOUT", BUFFER_TIMEOUT)
+    monkeypatch.setattr(main, "FLUSH_BYTES", FLUSH_BYTES)
+    return turns
+
+
+def wait_for_bytes(turns: list, total: int, timeout: float = 3.0):
+    """Wait until turns with `total` bytes have been recorded (or `timeout` passes)."""
+    deadline = time.monotonic() + timeout
+    while sum(len(s) for turn in turns for s in turn) < total and time.monotonic() < deadline:
+        time.sleep(0.05)
+    # Let a late, unexpected turn show up too
+    time.sleep(BUFFER_TIMEOUT + TURN_TIME)
+
+
+class TestAudioBuffering:
+    """Test that buffered audio reaches the pipeline intact."""
+
+    def test_size_flush_keeps_utterance_start(
+        self, sync_client, processed_turns, session_id_reader
+    ):
+        """Test an utterance longer than FLUSH_BYTES is processed in full, as one turn."""
+        chunks = [bytes([i]) * 100 for i in range(15)]
+
+        with sync_client.websocket_connect(
+            f"/ws?user_id=test_size_flush{XDIST_WORKER}&raw_audio=1"
+        ) as websocket:
+            session_id_reader(websocket)
+
+            # One utterance: chunks 20ms apart, well inside BUFFER_TIMEOUT
+            for chunk in chunks:
+                websocket.send_bytes(chunk)
+                time.sleep(0.02)
+
+            wait_for_bytes(processed_turns, sum(map(len, chunks)))
+
+        log.info("Segments processed: %s", [[len(s) for s in turn] for turn in processed_turns])
+        assert len(processed_turns) == 1, "Expected the whole utterance in one turn"
+        assert len(processed_turns[0]) >= 2, "Expected a size flush and a timeout flush"
+        assert b"".join(processed_turns[0]) == b"".join(chunks)
+
+    def test_interrupt_cancels_open_turn(
+        self, sync_client, processed_turns, session_id_reader
+    ):
+        """Test an interrupt cancels a turn still open after a size flush."""
+        chunks = [bytes([i]) * 100 for i in range(12)]
+
+        with sync_client.websocket_connect(
+            f"/ws?user_id=test_interrupt_open{XDIST_WORKER}&raw_audio=1"
+        ) as websocket:
+            session_id = session_id_reader(websocket)
+
+            # The 10th chunk is flushed on size; the last two stay buffered
+            for chunk in chunks:
+                websocket.send_bytes(chunk)
+            websocket.send_json({"event": "interrupt", "session_id": session_id, "data": {}})
+
+            wait_for_bytes(processed_turns, sum(map(len, chunks[10:])))
+
+        # Only what was still buffered makes a (new) turn
+        assert processed_turns == [[b"".join(chunks[10:])]]
+
+    def test_empty_first_chunk_does_not_stall(
+        self, sync_client, processed_turns, session_id_reader
+    ):
+        """Test audio after an empty chunk is still processed."""
+        chunks = [bytes([i]) * 100 for i in range(3)]
+
+        with sync_client.websocket_connect(
+            f"/ws?user_id=test_empty_first{XDIST_WORKER}"
+        ) as websocket:
+            session_id = session_id_reader(websocket)
+
+            # Decodes to b"" on the server
+            websocket.send_json({
+                "event": "audio_chunks_batch",
+                "session_id": session_id,
+                "data": {"chunks": ["", ""]}
+            })
+            # Speech starts only after the empty chunk's segment timed out
+            time.sleep(BUFFER_TIMEOUT + 0.2)
+            for chunk in chunks:
+                websocket.send_json({
+                    "event": "audio_chunks_batch",
+                    "session_id": session_id,
+                    "data": {"chunks": [base64.b64encode(chunk).decode()]}
+                })
+
+            wait_for_bytes(processed_turns, sum(map(len, chunks)))
+
+        assert processed_turns == [[b"".join(chunks)]]
+
+    def test_empty_binary_frames_are_dropped(
+        self, sync_client, processed_turns, session_id_reader
+    ):
+        """Test zero-length raw audio frames (empty MediaRecorder blobs) are skipped."""
+        chunks = [bytes([i]) * 100 for i in range(3)]
+
+        with sync_client.websocket_connect(
+            f"/ws?user_id=test_empty_frames{XDIST_WORKER}&raw_audio=1"
+        ) as websocket:
+            session_id_reader(websocket)
+
+            websocket.send_bytes(b"")
+            time.sleep(BUFFER_TIMEOUT + 0.2)
+            for chunk in chunks:
+                websocket.send_bytes(chunk)
+                websocket.send_bytes(b"")
+
+            wait_for_bytes(processed_turns, sum(map(len, chunks)))
+
+        assert processed_turns == [[b"".join(chunks)]]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--log-cli-level=INFO"])
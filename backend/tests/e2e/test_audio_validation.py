@@ -0,0 +1,87 @@
+"""
+E2E tests for server-side audio validation.
+
+Checks that a short, quiet WAV clip (a VAD false positive) is dropped
+before ASR, while a longer one at the same level, or a WebM clip whose
+energy isn't measured, is transcribed. ASR is replaced by a recorder.
+"""
+
+import io
+import os
+import time
+import wave
+import logging
+import numpy as np
+import pytest
+
+log = logging.getLogger(__name__)
+
+# Keeps user_ids distinct across pytest-xdist workers ("" when not under xdist)
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "")
+
+BUFFER_TIMEOUT = 0.3
+SAMPLE_RATE = 16000
+
+# Start of a WebM file (EBML header magic); the server doesn't decode it
+WEBM_CLIP = b"\x1a\x45\xdf\xa3" + bytes(2000)
+
+
+def make_wav_clip(duration_s: float) -> bytes:
+    """A voiced-sounding tone (RMS ~750, between the energy thresholds) as WAV."""
+    t = np.arange(int(SAMPLE_RATE * duration_s)) / SAMPLE_RATE
+    tone = 1000 * np.sin(2 * np.pi * 220 * t) * (1 + 0.5 * np.sin(2 * np.pi * 4 * t))
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(tone.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def transcribed_clips(sync_client, monkeypatch):
+    """Record the clips handed to ASR (which finds no speech in any of them)."""
+    import main
+
+    clips = []
+
+    async def _transcribe(audio_bytes: bytes) -> str:
+        clips.append(audio_bytes)
+        return ""
+
+    monkeypatch.setattr(main.asr_provider, "transcribe", _transcribe)
+    monkeypatch.setattr(main, "BUFFER_TIMEOUT", BUFFER_TIMEOUT)
+    return clips
+
+
+class TestAudioValidation:
+    """Test which buffered clips reach ASR."""
+
+    @pytest.mark.parametrize("clip,transcribed", [
+        (make_wav_clip(0.3), False),
+        (make_wav_clip(1.0), True),
+        (WEBM_CLIP, True),
+    ], ids=["short_wav", "long_wav", "webm"])
+    def test_short_quiet_clip_skips_asr(
+        self, sync_client, transcribed_clips, session_id_reader, clip, transcribed
+    ):
+        """Test a WAV clip under MIN_ASR_DURATION near the energy threshold skips ASR."""
+        with sync_client.websocket_connect(
+            f"/ws?user_id=test_asr_gate{XDIST_WORKER}&raw_audio=1"
+        ) as websocket:
+            session_id_reader(websocket)
+            websocket.send_bytes(clip)
+
+            # The segment times out, then validation runs in an executor
+            deadline = time.monotonic() + BUFFER_TIMEOUT + 2.0
+            while not transcribed_clips and time.monotonic() < deadline:
+                time.sleep(0.05)
+
+        log.info("Clips transcribed: %s", [len(c) for c in transcribed_clips])
+        assert (transcribed_clips == [clip]) is transcribed
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--log-cli-level=INFO"])
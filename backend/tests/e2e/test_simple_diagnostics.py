@@ -5,8 +5,11 @@ These tests verify basic server functionality without triggering
 the full audio processing pipeline.
 """
 
+import logging
 import pytest
-import json
+import orjson
+
+log = logging.getLogger(__name__)
 
 
 class TestSimpleDiagnostics:
@@ -18,22 +21,22 @@ class TestSimpleDiagnostics:
         assert response.status_code == 200
 
         data = response.json()
-        print(f"\n✅ Server Health:")
-        print(f"   Status: {data['status']}")
-        print(f"   TTS: {data['components']['tts']}")
-        print(f"   ASR: {data['components']['asr']}")
-        print(f"   WebRTC: {data['components']['webrtc']}")
-        print(f"   Agent: {data['components']['agent']}")
+        log.info("✅ Server Health:")
+        log.info("   Status: %s", data['status'])
+        log.info("   TTS: %s", data['components']['tts'])
+        log.info("   ASR: %s", data['components']['asr'])
+        log.info("   WebRTC: %s", data['components']['webrtc'])
+        log.info("   Agent: %s", data['components']['agent'])
 
     def test_websocket_connection(self, sync_client):
         """Test 2: Check WebSocket connection."""
         with sync_client.websocket_connect("/ws?user_id=test_user") as websocket:
-            msg = json.loads(websocket.receive_text())
+            msg = orjson.loads(websocket.receive_text())
 
-            print(f"\n✅ WebSocket Connected:")
-            print(f"   Event: {msg['event']}")
-            print(f"   Session ID: {msg['data']['session_id'][:8]}...")
-            print(f"   ICE Servers: {len(msg['data']['ice_servers'])}")
+            log.info("✅ WebSocket Connected:")
+            log.info("   Event: %s", msg['event'])
+            log.info("   Session ID: %.8s...", msg['data']['session_id'])
+            log.info("   ICE Servers: %s", len(msg['data']['ice_servers']))
 
             assert msg["event"] == "connected"
             assert "session_id" in msg["data"]
@@ -42,30 +45,29 @@ class TestSimpleDiagnostics:
     def test_ice_servers_configured(self, sync_client):
         """Test 3: Check ICE servers for WebRTC."""
         with sync_client.websocket_connect("/ws") as websocket:
-            msg = json.loads(websocket.receive_text())
+            msg = orjson.loads(websocket.receive_text())
             ice_servers = msg["data"]["ice_servers"]
 
-            print(f"\n✅ ICE Servers ({len(ice_servers)}):")
+            log.info("✅ ICE Servers (%s):", len(ice_servers))
             for server in ice_servers:
-                print(f"   - {server['urls']}")
+                log.info("   - %s", server['urls'])
 
             assert len(ice_servers) > 0
 
-    def test_heartbeat(self, sync_client):
+    def test_heartbeat(self, sync_client, session_id_reader):
         """Test 4: Check heartbeat works."""
         with sync_client.websocket_connect("/ws") as websocket:
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
+            session_id = session_id_reader(websocket)
 
             # Send heartbeat
-            websocket.send_text(json.dumps({
+            websocket.send_text(orjson.dumps({
                 "event": "heartbeat",
                 "session_id": session_id,
                 "data": {}
-            }))
+            }).decode())
 
-            print(f"\n✅ Heartbeat sent successfully")
+            log.info("✅ Heartbeat sent successfully")
 
 
 if __name__ == "__main__":
-    pytest.main([__file__, "-v", "-s"])
+    pytest.main([__file__, "-v", "--log-cli-level=INFO"])
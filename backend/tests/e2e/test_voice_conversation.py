@@ -12,12 +12,17 @@ Tests the complete voice agent interaction:
 Uses generated test audio files for realistic testing.
 """
 
+import os
+import logging
 import pytest
-import json
-import base64
-import asyncio
-import time
-from pathlib import Path
+from starlette.websockets import WebSocketDisconnect
+
+log = logging.getLogger(__name__)
+
+EMPTY_AUDIO_B64 = ""  # b64encode(b"")
+
+# Keeps user_ids distinct across pytest-xdist workers ("" when not under xdist)
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "")
 
 
 class TestVoiceConversation:
@@ -26,105 +31,89 @@ class TestVoiceConversation:
     def test_full_conversation_flow_with_webrtc(
         self,
         sync_client,
-        test_audio_chinese,
-        audio_encoder,
-        mock_webrtc
+        preencoded_chinese_batch,
+        session_id_placeholder,
+        mock_webrtc,
+        session_id_reader,
+        event_collector,
+        event_waiter
     ):
         """
         Test complete conversation flow with WebRTC enabled.
 
         This is the CORRECT flow that enables voice streaming.
         """
-        with sync_client.websocket_connect("/ws?user_id=test_full_flow") as websocket:
+        with sync_client.websocket_connect(f"/ws?user_id=test_full_flow{XDIST_WORKER}") as websocket:
             # Step 1: Receive connection confirmation
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
-            print(f"\n📞 Connected: {session_id}")
+            session_id = session_id_reader(websocket)
+            log.info("📞 Connected: %s", session_id)
 
             # Step 2: Setup WebRTC (CRITICAL for voice streaming)
             webrtc = mock_webrtc(session_id)
             offer = webrtc.create_offer()
 
-            websocket.send_text(json.dumps({
+            websocket.send_json({
                 "event": "webrtc_offer",
                 "session_id": session_id,
                 "data": {
                     "sdp": offer["sdp"],
                     "type": offer["type"]
                 }
-            }))
+            })
 
-            # Receive WebRTC answer
-            answer_msg = json.loads(websocket.receive_text())
-            assert answer_msg["event"] == "webrtc_answer"
-            print("✅ WebRTC setup complete")
-
-            # Step 3: Send audio chunk
-            # Use first chunk of test audio
-            audio_chunks = list(audio_encoder(test_audio_chinese, chunk_size=4096))
-            print(f"🎤 Sending {len(audio_chunks)} audio chunks...")
-
-            for chunk in audio_chunks:
-                websocket.send_text(json.dumps({
-                    "event": "audio_chunk",
-                    "session_id": session_id,
-                    "data": {
-                        "audio": chunk
-                    }
-                }))
+            # Step 3: Send the test audio, all chunks in one batch message.
+            # The server handles events in order, so this needn't wait for
+            # the answer: it is buffered once WebRTC is set up
+            log.info("🎤 Sending audio chunks as one batch...")
 
-            print("✅ Audio chunks sent")
+            websocket.send_text(preencoded_chinese_batch.replace(session_id_placeholder, session_id))
 
-            # Step 4: Wait for responses
-            # Should receive: transcript -> agent_response -> streaming_complete
-            messages = []
-            max_wait = 30  # seconds
-            start_time = time.time()
+            log.info("✅ Audio chunks sent")
 
-            while time.time() - start_time < max_wait:
-                try:
-                    # Use a short timeout to avoid blocking forever
-                    msg_text = websocket.receive_text()
-                    msg = json.loads(msg_text)
-                    messages.append(msg)
-
-                    print(f"📨 Received: {msg['event']}")
-
-                    if msg["event"] == "streaming_complete":
-                        print("✅ Voice streaming completed")
-                        break
+            # Receive WebRTC answer
+            answer_msg = event_waiter(websocket, {"webrtc_answer"})
+            assert answer_msg, "No webrtc_answer received"
+            log.info("✅ WebRTC setup complete")
 
-                except Exception as e:
-                    print(f"Error receiving message: {e}")
-                    break
+            # Step 4: Wait for responses
+            # Should receive: transcript -> agent_response -> streaming_complete
+            messages = event_collector(websocket, {"streaming_complete", "error"})
+            for msg in messages:
+                log.debug("📨 Received: %s", msg['event'])
 
             # Verify we received expected events
             events = [msg["event"] for msg in messages]
-            print(f"\n📊 Received events: {events}")
+            log.info("📊 Received events: %s", events)
+
+            by_event: dict[str, list[dict]] = {}
+            for msg in messages:
+                by_event.setdefault(msg["event"], []).append(msg)
 
             # Should have transcript, agent_response, and streaming_complete
             # Note: May also have "no_speech_detected" if audio isn't recognized
-            if "transcript" in events:
-                transcript_msg = next(m for m in messages if m["event"] == "transcript")
-                print(f"📝 Transcript: {transcript_msg['data']['text']}")
+            if "transcript" in by_event:
+                transcript_msg = by_event["transcript"][0]
+                log.info("📝 Transcript: %s", transcript_msg['data']['text'])
 
-            if "agent_response" in events:
-                response_msg = next(m for m in messages if m["event"] == "agent_response")
-                print(f"🤖 Agent: {response_msg['data']['text']}")
+            if "agent_response" in by_event:
+                response_msg = by_event["agent_response"][0]
+                log.info("🤖 Agent: %s", response_msg['data']['text'])
 
-            if "streaming_complete" in events:
-                print("🎵 TTS streaming completed")
+            if "streaming_complete" in by_event:
+                log.info("🎵 TTS streaming completed")
 
             # At minimum, we should get some response
             assert len(messages) > 0, "Should receive at least one message"
 
-            print("\n✅ Full conversation flow completed successfully")
+            log.info("✅ Full conversation flow completed successfully")
 
     def test_conversation_without_webrtc_shows_error(
         self,
         sync_client,
-        test_audio_chinese,
-        audio_encoder
+        preencoded_chinese_frames,
+        session_id_placeholder,
+        session_id_reader,
+        event_collector
     ):
         """
         Test conversation WITHOUT WebRTC - should show error.
@@ -132,260 +121,204 @@ class TestVoiceConversation:
         This demonstrates the voice streaming issue: without WebRTC setup,
         audio streaming fails with an error message.
         """
-        with sync_client.websocket_connect("/ws?user_id=test_no_webrtc_flow") as websocket:
+        with sync_client.websocket_connect(f"/ws?user_id=test_no_webrtc_flow{XDIST_WORKER}") as websocket:
             # Step 1: Connect
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
-            print(f"\n📞 Connected: {session_id}")
+            session_id = session_id_reader(websocket)
+            log.info("📞 Connected: %s", session_id)
 
             # Step 2: SKIP WebRTC setup (this is the problem!)
-            print("⚠️  Skipping WebRTC setup...")
+            log.info("⚠️  Skipping WebRTC setup...")
 
             # Step 3: Send audio
-            audio_chunks = list(audio_encoder(test_audio_chinese, chunk_size=4096))
-            print(f"🎤 Sending {len(audio_chunks)} audio chunks...")
+            log.info("🎤 Sending %s audio chunks...", len(preencoded_chinese_frames))
 
-            for chunk in audio_chunks:
-                websocket.send_text(json.dumps({
-                    "event": "audio_chunk",
-                    "session_id": session_id,
-                    "data": {
-                        "audio": chunk
-                    }
-                }))
+            for frame in preencoded_chinese_frames:
+                websocket.send_text(frame.replace(session_id_placeholder, session_id))
 
             # Step 4: Wait for responses
-            messages = []
-            max_wait = 30
-            start_time = time.time()
-
-            while time.time() - start_time < max_wait:
-                try:
-                    msg_text = websocket.receive_text()
-                    msg = json.loads(msg_text)
-                    messages.append(msg)
-
-                    print(f"📨 Received: {msg['event']}")
-
-                    # Look for error or agent_response
-                    if msg["event"] == "error":
-                        print(f"❌ Error: {msg['data']}")
-                        # This is expected - WebRTC not ready
-                        assert msg['data']['error_type'] == 'webrtc_not_ready'
-                        break
-
-                    if msg["event"] == "agent_response":
-                        # Got text response, but no TTS will be streamed
-                        print(f"🤖 Agent: {msg['data']['text']}")
-                        # Wait a bit more to see if error comes
-                        time.sleep(1)
-
-                except Exception as e:
-                    print(f"Error: {e}")
-                    break
+            # An error (expected: WebRTC not ready) ends the wait
+            messages = event_collector(websocket, {"streaming_complete", "error"})
+            for msg in messages:
+                log.debug("📨 Received: %s", msg['event'])
+                if msg["event"] == "agent_response":
+                    # Got text response, but no TTS will be streamed
+                    log.info("🤖 Agent: %s", msg['data']['text'])
 
             events = [msg["event"] for msg in messages]
-            print(f"\n📊 Events received: {events}")
+            log.info("📊 Events received: %s", events)
+
+            by_event: dict[str, list[dict]] = {}
+            for msg in messages:
+                by_event.setdefault(msg["event"], []).append(msg)
 
             # Should get transcript and agent_response, but ERROR for TTS
             # or no streaming_complete event
-            if "error" in events:
-                error_msg = next(m for m in messages if m["event"] == "error")
-                print(f"\n✅ Expected error received: {error_msg['data']['message']}")
+            if "error" in by_event:
+                error_msg = by_event["error"][0]
+                log.info("✅ Expected error received: %s", error_msg['data']['message'])
                 assert error_msg['data']['error_type'] == 'webrtc_not_ready'
             else:
                 # If no explicit error, streaming_complete should NOT be present
                 # (because WebRTC isn't set up, so streaming fails silently or with error)
-                print("\n⚠️  No explicit error, but TTS streaming should have failed")
+                log.info("⚠️  No explicit error, but TTS streaming should have failed")
 
     def test_interrupt_voice_streaming(
         self,
         sync_client,
-        test_audio_chinese,
-        audio_encoder,
-        mock_webrtc
+        preencoded_chinese_frames,
+        session_id_placeholder,
+        mock_webrtc,
+        session_id_reader,
+        event_collector,
+        event_waiter
     ):
         """Test interrupting ongoing voice streaming."""
-        with sync_client.websocket_connect("/ws?user_id=test_interrupt") as websocket:
+        with sync_client.websocket_connect(f"/ws?user_id=test_interrupt{XDIST_WORKER}") as websocket:
             # Setup
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
+            session_id = session_id_reader(websocket)
 
             # Setup WebRTC
             webrtc = mock_webrtc(session_id)
             offer = webrtc.create_offer()
-            websocket.send_text(json.dumps({
+            websocket.send_json({
                 "event": "webrtc_offer",
                 "session_id": session_id,
                 "data": offer
-            }))
-            json.loads(websocket.receive_text())  # Receive answer
-
-            # Send audio
-            audio_chunks = list(audio_encoder(test_audio_chinese, chunk_size=4096))
-            for chunk in audio_chunks:
-                websocket.send_text(json.dumps({
-                    "event": "audio_chunk",
-                    "session_id": session_id,
-                    "data": {"audio": chunk}
-                }))
+            })
+
+            # Send audio right behind the offer (handled in order)
+            for frame in preencoded_chinese_frames:
+                websocket.send_text(frame.replace(session_id_placeholder, session_id))
 
-            print("🎤 Audio sent, waiting for agent response...")
+            assert event_waiter(websocket, {"webrtc_answer"}), "No webrtc_answer received"
+
+            log.info("🎤 Audio sent, waiting for agent response...")
 
             # Wait for agent to start responding
-            received_agent_response = False
-            for _ in range(10):
-                try:
-                    msg = json.loads(websocket.receive_text())
-                    print(f"📨 {msg['event']}")
-
-                    if msg["event"] == "agent_response":
-                        received_agent_response = True
-                        print("🤖 Agent started responding...")
-
-                        # Send interrupt WHILE agent is responding
-                        websocket.send_text(json.dumps({
-                            "event": "interrupt",
-                            "session_id": session_id,
-                            "data": {
-                                "reason": "user_interruption"
-                            }
-                        }))
-                        print("🛑 Interrupt sent")
-                        break
-
-                except Exception as e:
-                    print(f"Error: {e}")
-                    break
+            messages = event_collector(websocket, {"agent_response"})
+            for msg in messages:
+                log.debug("📨 %s", msg['event'])
 
-            # Wait for interrupt acknowledgment
-            for _ in range(5):
-                try:
-                    msg = json.loads(websocket.receive_text())
-                    print(f"📨 {msg['event']}")
+            received_agent_response = bool(messages) and messages[-1]["event"] == "agent_response"
+            if received_agent_response:
+                log.info("🤖 Agent started responding...")
 
-                    if msg["event"] == "voice_interrupted":
-                        print(f"✅ Interrupt acknowledged: {msg['data']}")
-                        assert "interruption_time_ms" in msg["data"]
-                        return
+                # Send interrupt WHILE agent is responding
+                websocket.send_json({
+                    "event": "interrupt",
+                    "session_id": session_id,
+                    "data": {
+                        "reason": "user_interruption"
+                    }
+                })
+                log.info("🛑 Interrupt sent")
 
-                except Exception:
-                    break
+            # Wait for interrupt acknowledgment
+            ack = event_waiter(websocket, {"voice_interrupted"})
+            if ack:
+                log.info("✅ Interrupt acknowledged: %s", ack['data'])
+                assert "interruption_time_ms" in ack["data"]
+                return
 
             if received_agent_response:
-                print("✅ Interrupt flow completed")
+                log.info("✅ Interrupt flow completed")
 
     def test_multiple_audio_chunks_buffering(
         self,
         sync_client,
-        test_audio_query,
-        audio_encoder,
-        mock_webrtc
+        preencoded_query_frames,
+        session_id_placeholder,
+        mock_webrtc,
+        session_id_reader,
+        event_collector,
+        event_waiter
     ):
         """Test audio buffering with multiple chunks."""
-        with sync_client.websocket_connect("/ws?user_id=test_buffering") as websocket:
+        with sync_client.websocket_connect(f"/ws?user_id=test_buffering{XDIST_WORKER}") as websocket:
             # Setup
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
+            session_id = session_id_reader(websocket)
 
             # Setup WebRTC
             webrtc = mock_webrtc(session_id)
             offer = webrtc.create_offer()
-            websocket.send_text(json.dumps({
+            websocket.send_json({
                 "event": "webrtc_offer",
                 "session_id": session_id,
                 "data": offer
-            }))
-            json.loads(websocket.receive_text())
-
-            # Send multiple audio chunks with small delays
-            # (simulating real-time audio streaming)
-            audio_chunks = list(audio_encoder(test_audio_query, chunk_size=2048))
-            print(f"🎤 Sending {len(audio_chunks)} chunks with delays...")
+            })
 
-            for i, chunk in enumerate(audio_chunks):
-                websocket.send_text(json.dumps({
-                    "event": "audio_chunk",
-                    "session_id": session_id,
-                    "data": {"audio": chunk}
-                }))
-
-                # Small delay between chunks (simulate streaming)
-                if i < len(audio_chunks) - 1:
-                    time.sleep(0.1)
+            # Send the chunks back-to-back as separate messages, right behind
+            # the offer; all of them land within one BUFFER_TIMEOUT window,
+            # so the server should buffer them into a single segment
+            log.info("🎤 Sending %s chunks...", len(preencoded_query_frames))
 
-            print("✅ Buffered audio chunks sent")
+            for frame in preencoded_query_frames:
+                websocket.send_text(frame.replace(session_id_placeholder, session_id))
 
-            # Wait for processing
-            # Audio buffer has BUFFER_TIMEOUT of 1.5 seconds
-            print("⏳ Waiting for audio processing...")
+            log.info("✅ Buffered audio chunks sent")
 
-            messages = []
-            start_time = time.time()
-            while time.time() - start_time < 30:
-                try:
-                    msg = json.loads(websocket.receive_text())
-                    messages.append(msg)
-                    print(f"📨 {msg['event']}")
+            assert event_waiter(websocket, {"webrtc_answer"}), "No webrtc_answer received"
 
-                    if msg["event"] == "streaming_complete":
-                        break
+            # Wait for processing: the segment flushes BUFFER_TIMEOUT after
+            # the last chunk, and the collector waits on that directly
+            log.info("⏳ Waiting for audio processing...")
 
-                except Exception as e:
-                    print(f"Error: {e}")
-                    break
+            messages = event_collector(websocket, {"streaming_complete", "error"})
+            for msg in messages:
+                log.debug("📨 %s", msg['event'])
 
             events = [m["event"] for m in messages]
-            print(f"📊 Events: {events}")
+            log.info("📊 Events: %s", events)
 
-            print("✅ Audio buffering test completed")
+            log.info("✅ Audio buffering test completed")
 
     def test_empty_audio_handling(
         self,
         sync_client,
-        mock_webrtc
+        mock_webrtc,
+        session_id_reader,
+        event_receiver,
+        event_waiter
     ):
         """Test handling of empty or invalid audio."""
-        with sync_client.websocket_connect("/ws?user_id=test_empty_audio") as websocket:
+        with sync_client.websocket_connect(f"/ws?user_id=test_empty_audio{XDIST_WORKER}") as websocket:
             # Setup
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
+            session_id = session_id_reader(websocket)
 
             # Setup WebRTC
             webrtc = mock_webrtc(session_id)
             offer = webrtc.create_offer()
-            websocket.send_text(json.dumps({
+            websocket.send_json({
                 "event": "webrtc_offer",
                 "session_id": session_id,
                 "data": offer
-            }))
-            json.loads(websocket.receive_text())
+            })
 
-            # Send empty audio
-            websocket.send_text(json.dumps({
+            # Send empty audio right behind the offer (handled in order)
+            websocket.send_json({
                 "event": "audio_chunk",
                 "session_id": session_id,
                 "data": {
-                    "audio": base64.b64encode(b"").decode('utf-8')
+                    "audio": EMPTY_AUDIO_B64
                 }
-            }))
+            })
 
-            print("🎤 Sent empty audio")
+            log.info("🎤 Sent empty audio")
 
-            # Should get no_speech_detected or similar
-            time.sleep(2)  # Wait for processing
+            assert event_waiter(websocket, {"webrtc_answer"}), "No webrtc_answer received"
 
+            # Should get no_speech_detected or similar, or nothing at all
             try:
-                msg = json.loads(websocket.receive_text())
-                print(f"📨 {msg['event']}: {msg.get('data', {})}")
+                msg = event_receiver(websocket, timeout=2.0)
+            except (TimeoutError, WebSocketDisconnect):
+                log.info("✅ No response for empty audio (handled gracefully)")
+            else:
+                log.debug("📨 %s: %s", msg['event'], msg.get('data', {}))
 
                 # Should handle gracefully
                 if msg["event"] == "no_speech_detected":
-                    print("✅ Empty audio handled correctly")
-
-            except Exception:
-                print("✅ No response for empty audio (handled gracefully)")
+                    log.info("✅ Empty audio handled correctly")
 
 
 if __name__ == "__main__":
-    pytest.main([__file__, "-v", "-s"])
+    pytest.main([__file__, "-v", "--log-cli-level=INFO"])
@@ -5,346 +5,293 @@ These tests specifically check if TTS audio is being streamed via WebRTC.
 Use these to diagnose "no audio output" problems.
 """
 
+import os
+import logging
 import pytest
-import json
-import time
-import base64
+
+log = logging.getLogger(__name__)
+
+_BANNER = "=" * 60
+
+# Silent audio as base64: zero bytes encode to 'A's plus padding
+DUMMY_AUDIO_1024_B64 = 'A' * 1366 + '=='  # b64encode(b'\x00' * 1024)
+
+# Keeps user_ids distinct across pytest-xdist workers ("" when not under xdist)
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "")
 
 
 class TestWebRTCAudioOutput:
     """Diagnostic tests for WebRTC audio streaming."""
 
-    def test_check_webrtc_enabled_flag(self, sync_client, mock_webrtc):
+    def test_connect_metadata(self, sync_client, mock_webrtc, event_waiter):
         """
-        Test 1: Verify webrtc_enabled flag is set after offer/answer.
+        Test 1: Verify the welcome's ICE servers, then the offer/answer exchange.
 
-        This is THE critical check - if this flag isn't True, no audio will stream.
+        One connection covers both: ICE servers are needed for NAT traversal,
+        and the answer is what sets webrtc_enabled - if that flag isn't True,
+        no audio will stream. Also prints what to look for in the server logs.
         """
-        with sync_client.websocket_connect("/ws?user_id=test_webrtc_flag") as websocket:
-            print("\n" + "="*60)
-            print("TEST 1: Checking webrtc_enabled flag")
-            print("="*60)
+        with sync_client.websocket_connect(f"/ws?user_id=test_connect_metadata{XDIST_WORKER}") as websocket:
+            log.info(_BANNER)
+            log.info("TEST 1: Checking ICE servers and webrtc_enabled flag")
+            log.info(_BANNER)
 
             # Connect
-            connect_msg = json.loads(websocket.receive_text())
+            connect_msg = websocket.receive_json()
             session_id = connect_msg["data"]["session_id"]
-            print(f"✅ Connected: {session_id}")
+            log.info("✅ Connected: %s", session_id)
+
+            _log_ice_servers(connect_msg["data"]["ice_servers"])
+            _log_server_log_guide(session_id)
 
             # Send WebRTC offer
             webrtc = mock_webrtc(session_id)
             offer = webrtc.create_offer()
 
-            print(f"\n📤 Sending WebRTC offer...")
-            websocket.send_text(json.dumps({
+            log.info("📤 Sending WebRTC offer...")
+            websocket.send_json({
                 "event": "webrtc_offer",
                 "session_id": session_id,
                 "data": {
                     "sdp": offer["sdp"],
                     "type": offer["type"]
                 }
-            }))
+            })
 
             # Receive answer
-            answer_msg = json.loads(websocket.receive_text())
-
-            print(f"\n📥 Received: {answer_msg['event']}")
-
-            if answer_msg["event"] == "webrtc_answer":
-                print("✅ PASS: WebRTC offer/answer exchange successful")
-                print(f"   SDP length: {len(answer_msg['data']['sdp'])}")
-                print(f"   Type: {answer_msg['data']['type']}")
-                print("\n⚠️  IMPORTANT: Frontend must now:")
-                print("   1. Set this as remote description")
-                print("   2. Listen for audio track events")
-                print("   3. Play the received audio stream")
+            answer_msg = event_waiter(websocket, {"webrtc_answer"})
+
+            if answer_msg:
+                log.info("✅ PASS: WebRTC offer/answer exchange successful")
+                log.info("   SDP length: %s", len(answer_msg['data']['sdp']))
+                log.info("   Type: %s", answer_msg['data']['type'])
+                log.info("⚠️  IMPORTANT: Frontend must now:")
+                log.info("   1. Set this as remote description")
+                log.info("   2. Listen for audio track events")
+                log.info("   3. Play the received audio stream")
+                log.info("👉 NOW CHECK SERVER LOGS for:")
+                log.info("   'session=%.8s... | webrtc_enabled=True'", session_id)
             else:
-                print(f"❌ FAIL: Expected webrtc_answer, got {answer_msg['event']}")
+                log.info("❌ FAIL: No webrtc_answer received - check server logs for errors")
                 pytest.fail("WebRTC setup failed")
 
-    def test_audio_streaming_with_webrtc(self, sync_client, mock_webrtc):
+    def test_audio_streaming_with_webrtc(
+        self, sync_client, mock_webrtc, session_id_reader, event_collector, event_waiter
+    ):
         """
         Test 2: Verify TTS audio streaming occurs when WebRTC is set up.
 
         Sends a simple text message that should trigger TTS audio streaming.
         """
-        with sync_client.websocket_connect("/ws?user_id=test_audio_stream") as websocket:
-            print("\n" + "="*60)
-            print("TEST 2: Checking TTS audio streaming")
-            print("="*60)
+        with sync_client.websocket_connect(f"/ws?user_id=test_audio_stream{XDIST_WORKER}") as websocket:
+            log.info(_BANNER)
+            log.info("TEST 2: Checking TTS audio streaming")
+            log.info(_BANNER)
 
             # Setup
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
-            print(f"✅ Connected: {session_id}")
+            session_id = session_id_reader(websocket)
+            log.info("✅ Connected: %s", session_id)
 
             # Setup WebRTC
             webrtc = mock_webrtc(session_id)
             offer = webrtc.create_offer()
 
-            print(f"\n📤 Setting up WebRTC...")
-            websocket.send_text(json.dumps({
+            log.info("📤 Setting up WebRTC...")
+            websocket.send_json({
                 "event": "webrtc_offer",
                 "session_id": session_id,
                 "data": {
                     "sdp": offer["sdp"],
                     "type": offer["type"]
                 }
-            }))
-
-            answer_msg = json.loads(websocket.receive_text())
-            assert answer_msg["event"] == "webrtc_answer"
-            print("✅ WebRTC setup complete")
+            })
 
-            # Send a simple audio chunk to trigger agent response
-            # Use minimal audio data
-            dummy_audio = b'\x00' * 1024  # 1KB of silence
-            audio_b64 = base64.b64encode(dummy_audio).decode('utf-8')
+            # Send a simple audio chunk to trigger agent response, right
+            # behind the offer (the server handles events in order)
+            # Use minimal audio data (1KB of silence)
 
-            print(f"\n📤 Sending audio chunk to trigger agent response...")
-            websocket.send_text(json.dumps({
+            log.info("📤 Sending audio chunk to trigger agent response...")
+            websocket.send_json({
                 "event": "audio_chunk",
                 "session_id": session_id,
                 "data": {
-                    "audio": audio_b64
+                    "audio": DUMMY_AUDIO_1024_B64
                 }
-            }))
+            })
+
+            answer_msg = event_waiter(websocket, {"webrtc_answer"})
+            assert answer_msg, "No webrtc_answer received"
+            log.info("✅ WebRTC setup complete")
 
             # Wait for responses
-            print("\n⏳ Waiting for agent response and audio streaming...")
-            messages = []
-            max_wait = 20
-            start_time = time.time()
-
-            while time.time() - start_time < max_wait:
-                try:
-                    msg = json.loads(websocket.receive_text())
-                    messages.append(msg)
-                    event = msg['event']
-
-                    print(f"📥 Received: {event}")
-
-                    if event == "error":
-                        error_type = msg['data'].get('error_type', 'unknown')
-                        error_message = msg['data'].get('message', 'unknown')
-
-                        if error_type == "webrtc_not_ready":
-                            print(f"\n❌ FAIL: WebRTC not ready!")
-                            print(f"   Message: {error_message}")
-                            print("\n🔍 DIAGNOSIS:")
-                            print("   - WebRTC offer/answer completed BUT flag not set")
-                            print("   - Check server logs for WebRTC setup errors")
-                            print("   - Verify WebRTC manager is working correctly")
-                            pytest.fail("WebRTC audio streaming failed: WebRTC not ready")
-                        else:
-                            print(f"\n⚠️  Error: {error_type} - {error_message}")
-
-                    elif event == "streaming_complete":
-                        print("\n✅ PASS: Audio streaming completed!")
-                        print(f"\n📊 Message sequence received:")
-                        for i, m in enumerate(messages, 1):
-                            print(f"   {i}. {m['event']}")
-                        return
-
-                except Exception as e:
-                    print(f"Error receiving message: {e}")
-                    break
+            log.info("⏳ Waiting for agent response and audio streaming...")
+            messages = event_collector(websocket, {"streaming_complete", "error"})
+
+            for msg in messages:
+                event = msg['event']
+                log.debug("📥 Received: %s", event)
+
+                if event == "error":
+                    error_type = msg['data'].get('error_type', 'unknown')
+                    error_message = msg['data'].get('message', 'unknown')
+
+                    if error_type == "webrtc_not_ready":
+                        log.info("❌ FAIL: WebRTC not ready!")
+                        log.info("   Message: %s", error_message)
+                        log.info("🔍 DIAGNOSIS:")
+                        log.info("   - WebRTC offer/answer completed BUT flag not set")
+                        log.info("   - Check server logs for WebRTC setup errors")
+                        log.info("   - Verify WebRTC manager is working correctly")
+                        pytest.fail("WebRTC audio streaming failed: WebRTC not ready")
+                    else:
+                        log.info("⚠️  Error: %s - %s", error_type, error_message)
+
+                elif event == "streaming_complete":
+                    log.info("✅ PASS: Audio streaming completed!")
+                    log.info("📊 Message sequence received:")
+                    for i, m in enumerate(messages, 1):
+                        log.info("   %s. %s", i, m['event'])
+                    return
 
             # Analyze what we got
             events = [m['event'] for m in messages]
-            print(f"\n📊 Events received: {events}")
-
-            if "error" in events:
-                error_msg = next(m for m in messages if m['event'] == 'error')
-                print(f"\n❌ FAIL: Received error: {error_msg['data']}")
-
-            if "streaming_complete" not in events:
-                print(f"\n⚠️  WARNING: No 'streaming_complete' event received")
-                print(f"\n🔍 DIAGNOSIS:")
-                if "agent_response" in events:
-                    print("   ✅ Agent text response received")
-                    print("   ❌ But no TTS audio streaming")
-                    print("\n   Possible causes:")
-                    print("   1. WebRTC track not created on server")
-                    print("   2. FFmpeg conversion failing")
-                    print("   3. Audio chunks not being sent to WebRTC")
+            log.info("📊 Events received: %s", events)
+
+            by_event: dict[str, list[dict]] = {}
+            for m in messages:
+                by_event.setdefault(m['event'], []).append(m)
+
+            if "error" in by_event:
+                error_msg = by_event['error'][0]
+                log.info("❌ FAIL: Received error: %s", error_msg['data'])
+
+            if "streaming_complete" not in by_event:
+                log.info("⚠️  WARNING: No 'streaming_complete' event received")
+                log.info("🔍 DIAGNOSIS:")
+                if "agent_response" in by_event:
+                    log.info("   ✅ Agent text response received")
+                    log.info("   ❌ But no TTS audio streaming")
+                    log.info("   Possible causes:")
+                    log.info("   1. WebRTC track not created on server")
+                    log.info("   2. FFmpeg conversion failing")
+                    log.info("   3. Audio chunks not being sent to WebRTC")
                 else:
-                    print("   ❌ No agent response at all")
-                    print("\n   Possible causes:")
-                    print("   1. Audio validation failed (no speech detected)")
-                    print("   2. ASR transcription failed")
-                    print("   3. Agent processing failed")
-
-    def test_audio_without_webrtc_shows_error(self, sync_client):
+                    log.info("   ❌ No agent response at all")
+                    log.info("   Possible causes:")
+                    log.info("   1. Audio validation failed (no speech detected)")
+                    log.info("   2. ASR transcription failed")
+                    log.info("   3. Agent processing failed")
+
+    def test_audio_without_webrtc_shows_error(
+        self, sync_client, session_id_reader, event_collector
+    ):
         """
         Test 3: Verify error message when WebRTC is NOT set up.
 
         This demonstrates what happens when frontend skips WebRTC setup.
         """
-        with sync_client.websocket_connect("/ws?user_id=test_no_webrtc_error") as websocket:
-            print("\n" + "="*60)
-            print("TEST 3: Checking error when WebRTC NOT set up")
-            print("="*60)
+        with sync_client.websocket_connect(f"/ws?user_id=test_no_webrtc_error{XDIST_WORKER}") as websocket:
+            log.info(_BANNER)
+            log.info("TEST 3: Checking error when WebRTC NOT set up")
+            log.info(_BANNER)
 
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
-            print(f"✅ Connected: {session_id}")
+            session_id = session_id_reader(websocket)
+            log.info("✅ Connected: %s", session_id)
 
             # SKIP WebRTC setup intentionally
-            print(f"\n⚠️  Skipping WebRTC setup (simulating frontend issue)...")
+            log.info("⚠️  Skipping WebRTC setup (simulating frontend issue)...")
 
             # Send audio to trigger agent response
-            dummy_audio = b'\x00' * 1024
-            audio_b64 = base64.b64encode(dummy_audio).decode('utf-8')
-
-            print(f"\n📤 Sending audio chunk...")
-            websocket.send_text(json.dumps({
+            log.info("📤 Sending audio chunk...")
+            websocket.send_json({
                 "event": "audio_chunk",
                 "session_id": session_id,
                 "data": {
-                    "audio": audio_b64
+                    "audio": DUMMY_AUDIO_1024_B64
                 }
-            }))
+            })
 
             # Wait for response
-            print("\n⏳ Waiting for response...")
-            messages = []
-            max_wait = 20
-            start_time = time.time()
-
-            while time.time() - start_time < max_wait:
-                try:
-                    msg = json.loads(websocket.receive_text())
-                    messages.append(msg)
-                    event = msg['event']
-
-                    print(f"📥 Received: {event}")
-
-                    if event == "error" and msg['data'].get('error_type') == 'webrtc_not_ready':
-                        print(f"\n✅ PASS: Correct error received!")
-                        print(f"   Error message: {msg['data']['message']}")
-                        print("\n🔍 THIS IS THE ISSUE:")
-                        print("   Frontend is NOT setting up WebRTC before audio streaming")
-                        print("   Server correctly rejects TTS streaming without WebRTC")
-                        return
-
-                    elif event == "streaming_complete":
-                        print(f"\n⚠️  Unexpected: Got streaming_complete without WebRTC!")
-
-                except Exception as e:
-                    print(f"Error: {e}")
-                    break
-
-            events = [m['event'] for m in messages]
-            print(f"\n📊 Events received: {events}")
-
-            if "error" not in events:
-                print(f"\n⚠️  No error received - server may have changed behavior")
-
-    def test_ice_servers_provided(self, sync_client):
-        """
-        Test 4: Verify ICE servers are provided for NAT traversal.
-
-        Without ICE servers, WebRTC may fail in real-world scenarios.
-        """
-        with sync_client.websocket_connect("/ws?user_id=test_ice_servers") as websocket:
-            print("\n" + "="*60)
-            print("TEST 4: Checking ICE servers configuration")
-            print("="*60)
-
-            connect_msg = json.loads(websocket.receive_text())
-            ice_servers = connect_msg["data"]["ice_servers"]
-
-            print(f"\n📊 ICE Servers Configuration:")
-            print(f"   Count: {len(ice_servers)}")
-
-            has_stun = False
-            has_turn = False
-
-            for i, server in enumerate(ice_servers, 1):
-                urls = server.get('urls', '')
-                print(f"\n   Server {i}:")
-                print(f"      URLs: {urls}")
-
-                if urls.startswith('stun:'):
-                    has_stun = True
-                    print(f"      Type: STUN (NAT traversal)")
-                elif urls.startswith('turn:'):
-                    has_turn = True
-                    print(f"      Type: TURN (relay)")
-                    if 'username' in server:
-                        print(f"      Auth: ✅ (username provided)")
-                    else:
-                        print(f"      Auth: ❌ (no credentials)")
-
-            print(f"\n📊 Summary:")
-            print(f"   STUN servers: {'✅ Yes' if has_stun else '❌ No'}")
-            print(f"   TURN servers: {'✅ Yes' if has_turn else '⚠️  No (may fail behind strict NAT)'}")
+            log.info("⏳ Waiting for response...")
+            messages = event_collector(websocket, {"error"})
 
-            if not has_stun:
-                print(f"\n⚠️  WARNING: No STUN servers configured!")
-                print(f"   WebRTC may fail to establish connection")
-
-    def test_server_logs_diagnostic(self, sync_client, mock_webrtc):
-        """
-        Test 5: Trigger full flow and show what to check in server logs.
+            for msg in messages:
+                event = msg['event']
+                log.debug("📥 Received: %s", event)
 
-        This test guides you through checking server logs for the issue.
-        """
-        with sync_client.websocket_connect("/ws?user_id=test_diagnostic") as websocket:
-            print("\n" + "="*60)
-            print("TEST 5: Server Log Diagnostic Guide")
-            print("="*60)
+                if event == "error" and msg['data'].get('error_type') == 'webrtc_not_ready':
+                    log.info("✅ PASS: Correct error received!")
+                    log.info("   Error message: %s", msg['data']['message'])
+                    log.info("🔍 THIS IS THE ISSUE:")
+                    log.info("   Frontend is NOT setting up WebRTC before audio streaming")
+                    log.info("   Server correctly rejects TTS streaming without WebRTC")
+                    return
 
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
-            session_short = session_id[:8]
+                elif event == "streaming_complete":
+                    log.info("⚠️  Unexpected: Got streaming_complete without WebRTC!")
 
-            print(f"\n🔍 Session ID: {session_id}")
-            print(f"   (Short: {session_short}...)")
+            events = [m['event'] for m in messages]
+            log.info("📊 Events received: %s", events)
 
-            print("\n📋 CHECK SERVER LOGS FOR THESE MESSAGES:")
-            print(f"\n1. WebRTC Setup:")
-            print(f"   ✅ Look for: 'session={session_short}... | webrtc_enabled=True'")
-            print(f"   ❌ If False: WebRTC setup failed")
+            if "error" not in events:
+                log.info("⚠️  No error received - server may have changed behavior")
+
+
+def _log_ice_servers(ice_servers: list):
+    """Report the ICE servers from the welcome message."""
+    log.info("📊 ICE Servers Configuration:")
+    log.info("   Count: %s", len(ice_servers))
+
+    has_stun = False
+    has_turn = False
+
+    for i, server in enumerate(ice_servers, 1):
+        urls = server.get('urls', '')
+        log.info("   Server %s:", i)
+        log.info("      URLs: %s", urls)
+
+        if urls.startswith('stun:'):
+            has_stun = True
+            log.info("      Type: STUN (NAT traversal)")
+        elif urls.startswith('turn:'):
+            has_turn = True
+            log.info("      Type: TURN (relay)")
+            if 'username' in server:
+                log.info("      Auth: ✅ (username provided)")
+            else:
+                log.info("      Auth: ❌ (no credentials)")
 
-            print(f"\n2. TTS Streaming Attempt:")
-            print(f"   ✅ Look for: 'Routing TTS to WebRTC for session {session_short}...'")
-            print(f"   ❌ If missing: stream_tts_response not called or blocked")
+    log.info("📊 Summary:")
+    log.info("   STUN servers: %s", '✅ Yes' if has_stun else '❌ No')
+    log.info("   TURN servers: %s", '✅ Yes' if has_turn else '⚠️  No (may fail behind strict NAT)')
 
-            print(f"\n3. FFmpeg Process:")
-            print(f"   ✅ Look for: 'Starting FFmpeg input stream for session {session_short}...'")
-            print(f"   ❌ If missing: FFmpeg not starting")
+    if not has_stun:
+        log.info("⚠️  WARNING: No STUN servers configured!")
+        log.info("   WebRTC may fail to establish connection")
 
-            print(f"\n4. Audio Chunks:")
-            print(f"   ✅ Look for: 'PCM chunk #X' messages")
-            print(f"   ❌ If missing: Audio not being sent to WebRTC")
 
-            print(f"\n5. Errors:")
-            print(f"   🔍 Look for: 'ERROR' or 'WebRTC not enabled' near session {session_short}")
+def _log_server_log_guide(session_id: str):
+    """Report which server log lines to check for this session."""
+    log.info("📋 CHECK SERVER LOGS FOR THESE MESSAGES:")
+    log.info("1. WebRTC Setup:")
+    log.info("   ✅ Look for: 'session=%.8s... | webrtc_enabled=True'", session_id)
+    log.info("   ❌ If False: WebRTC setup failed")
 
-            # Setup WebRTC
-            webrtc = mock_webrtc(session_id)
-            offer = webrtc.create_offer()
+    log.info("2. TTS Streaming Attempt:")
+    log.info("   ✅ Look for: 'Routing TTS to WebRTC for session %.8s...'", session_id)
+    log.info("   ❌ If missing: stream_tts_response not called or blocked")
 
-            print(f"\n📤 Sending WebRTC offer...")
-            websocket.send_text(json.dumps({
-                "event": "webrtc_offer",
-                "session_id": session_id,
-                "data": {
-                    "sdp": offer["sdp"],
-                    "type": offer["type"]
-                }
-            }))
+    log.info("3. FFmpeg Process:")
+    log.info("   ✅ Look for: 'Starting FFmpeg input stream for session %.8s...'", session_id)
+    log.info("   ❌ If missing: FFmpeg not starting")
 
-            answer_msg = json.loads(websocket.receive_text())
+    log.info("4. Audio Chunks:")
+    log.info("   ✅ Look for: 'PCM chunk #X' messages")
+    log.info("   ❌ If missing: Audio not being sent to WebRTC")
 
-            if answer_msg["event"] == "webrtc_answer":
-                print(f"✅ WebRTC setup completed")
-                print(f"\n👉 NOW CHECK SERVER LOGS for:")
-                print(f"   'session={session_short}... | webrtc_enabled=True'")
-            else:
-                print(f"❌ WebRTC setup failed - check server logs for errors")
+    log.info("5. Errors:")
+    log.info("   🔍 Look for: 'ERROR' or 'WebRTC not enabled' near session %.8s", session_id)
 
 
 if __name__ == "__main__":
-    pytest.main([__file__, "-v", "-s"])
+    pytest.main([__file__, "-v", "--log-cli-level=INFO"])
@@ -5,183 +5,133 @@ Tests WebRTC offer/answer exchange, ICE candidate handling,
 and audio streaming setup.
 """
 
+import logging
 import pytest
-import json
-import asyncio
+import orjson
+
+log = logging.getLogger(__name__)
+
+# Pre-serialized webrtc_offer event; fill in (session_id, sdp, type) with %,
+# the SDP already JSON-encoded (orjson.dumps) so it is escaped correctly
+WEBRTC_OFFER = b'{"event":"webrtc_offer","session_id":"%b","data":{"sdp":%b,"type":"%b"}}'
+
+# Pre-serialized host ICE candidate event; fill in the session ID with %
+ICE_CANDIDATE = orjson.dumps({
+    "event": "webrtc_ice_candidate",
+    "session_id": "%b",
+    "data": {
+        "candidate": "candidate:1 1 UDP 2130706431 192.168.1.1 54321 typ host",
+        "sdpMLineIndex": 0,
+        "sdpMid": "0"
+    }
+})
 
 
 class TestWebRTCSetup:
     """Test WebRTC connection setup."""
 
-    def test_webrtc_offer_answer_exchange(self, sync_client, mock_webrtc):
-        """Test WebRTC offer/answer exchange."""
-        with sync_client.websocket_connect("/ws?user_id=test_webrtc_1") as websocket:
-            # Receive connection confirmation
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
-            ice_servers = connect_msg["data"]["ice_servers"]
-
-            print(f"Session ID: {session_id}")
-            print(f"ICE servers: {ice_servers}")
-
-            # Verify ICE servers are provided
-            assert isinstance(ice_servers, list)
-            assert len(ice_servers) > 0
-
-            # Create mock WebRTC connection
-            webrtc = mock_webrtc(session_id)
-            offer = webrtc.create_offer()
-
-            # Send WebRTC offer
-            websocket.send_text(json.dumps({
-                "event": "webrtc_offer",
-                "session_id": session_id,
-                "data": {
-                    "sdp": offer["sdp"],
-                    "type": offer["type"]
-                }
-            }))
-
-            # Receive WebRTC answer
-            answer_msg = json.loads(websocket.receive_text())
-            print(f"Received answer: {answer_msg}")
-
-            assert answer_msg["event"] == "webrtc_answer"
-            assert "sdp" in answer_msg["data"]
-            assert "type" in answer_msg["data"]
-            assert answer_msg["data"]["type"] == "answer"
-
-            # Set remote description
-            webrtc.set_remote_description(
-                answer_msg["data"]["sdp"],
-                answer_msg["data"]["type"]
-            )
-
-            print("✅ WebRTC offer/answer exchange completed")
-
-    def test_webrtc_ice_candidate(self, sync_client, mock_webrtc):
+    @pytest.mark.no_pool
+    @pytest.mark.parametrize("offer_shape, expect_answer", [
+        ("flat", True),
+        # Nested form, kept for backwards compatibility
+        ("nested", True),
+        # Invalid: the server should log an error and carry on
+        ("missing_sdp", False),
+    ])
+    def test_webrtc_offer_variants(
+        self, pooled_ws, cached_offer, session_id_placeholder, batch_sender, event_waiter,
+        event_collector, offer_shape, expect_answer
+    ):
+        """Test webrtc_offer payload shapes: an answer for valid ones, no crash otherwise."""
+        websocket, session_id = pooled_ws.websocket, pooled_ws.session_id
+
+        sdp_template, offer_type = cached_offer
+        offer = {
+            "sdp": sdp_template.replace(session_id_placeholder, session_id),
+            "type": offer_type
+        }
+        offer_data = {
+            "flat": offer,
+            "nested": {"offer": offer},
+            "missing_sdp": {"type": offer_type},
+        }[offer_shape]
+
+        # Send the offer with another event behind it in the same frame,
+        # which the server only reaches if it got through the offer. After an
+        # invalid offer that is an interrupt, so its reply proves it
+        follow_up = "heartbeat" if expect_answer else "interrupt"
+        batch_sender(websocket, [
+            {"event": "webrtc_offer", "session_id": session_id, "data": offer_data},
+            {"event": follow_up, "session_id": session_id, "data": {}},
+        ])
+
+        if not expect_answer:
+            events = [m["event"] for m in event_collector(websocket, {"voice_interrupted"})]
+            assert events[-1:] == ["voice_interrupted"], f"No reply after the offer: {events}"
+            assert "webrtc_answer" not in events
+            log.info("✅ Invalid WebRTC offer handled gracefully")
+            return
+
+        # Receive WebRTC answer
+        answer_msg = event_waiter(websocket, {"webrtc_answer"})
+        log.debug("Received answer: %s", answer_msg)
+
+        assert answer_msg, "No webrtc_answer received"
+        assert "sdp" in answer_msg["data"]
+        assert answer_msg["data"]["type"] == "answer"
+
+        log.info("✅ WebRTC offer (%s) answered", offer_shape)
+
+    @pytest.mark.no_pool
+    def test_webrtc_ice_candidate(
+        self, pooled_ws, cached_offer, session_id_placeholder, event_waiter
+    ):
         """Test WebRTC ICE candidate exchange."""
-        with sync_client.websocket_connect("/ws?user_id=test_webrtc_ice") as websocket:
-            # Receive connection confirmation
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
-
-            # Complete WebRTC offer/answer first
-            webrtc = mock_webrtc(session_id)
-            offer = webrtc.create_offer()
-
-            websocket.send_text(json.dumps({
-                "event": "webrtc_offer",
-                "session_id": session_id,
-                "data": {
-                    "sdp": offer["sdp"],
-                    "type": offer["type"]
-                }
-            }))
-
-            # Receive answer
-            json.loads(websocket.receive_text())
-
-            # Send ICE candidate
-            ice_candidate = {
-                "candidate": "candidate:1 1 UDP 2130706431 192.168.1.1 54321 typ host",
-                "sdpMLineIndex": 0,
-                "sdpMid": "0"
-            }
-
-            websocket.send_text(json.dumps({
-                "event": "webrtc_ice_candidate",
-                "session_id": session_id,
-                "data": ice_candidate
-            }))
-
-            print("✅ ICE candidate sent successfully")
-
-    def test_webrtc_without_offer(self, sync_client):
+        websocket, session_id = pooled_ws.websocket, pooled_ws.session_id
+
+        sdp_template, offer_type = cached_offer
+        sid = session_id.encode()
+        offer_frame = WEBRTC_OFFER % (
+            sid, orjson.dumps(sdp_template.replace(session_id_placeholder, session_id)),
+            offer_type.encode()
+        )
+
+        # Send offer and ICE candidate in one JSON array frame; the server
+        # completes the offer/answer before it handles the candidate
+        websocket.send_bytes(b"[%b,%b]" % (offer_frame, ICE_CANDIDATE % sid))
+
+        # Receive answer
+        assert event_waiter(websocket, {"webrtc_answer"}), "No webrtc_answer received"
+
+        log.info("✅ ICE candidate sent successfully")
+
+    def test_webrtc_without_offer(self, pooled_ws):
         """Test attempting to stream audio without WebRTC setup."""
-        with sync_client.websocket_connect("/ws?user_id=test_no_webrtc") as websocket:
-            # Receive connection confirmation
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
+        session_id = pooled_ws.session_id
 
-            # Try to send audio without WebRTC setup
-            # This should fail gracefully
-            # (In real scenario, audio would trigger agent response with TTS,
-            # which would fail due to missing WebRTC)
+        # Try to send audio without WebRTC setup
+        # This should fail gracefully
+        # (In real scenario, audio would trigger agent response with TTS,
+        # which would fail due to missing WebRTC)
 
-            print(f"✅ Session created without WebRTC: {session_id}")
-            # The actual audio streaming test is in test_voice_conversation.py
+        log.info("✅ Session created without WebRTC: %s", session_id)
+        # The actual audio streaming test is in test_voice_conversation.py
 
-    def test_ice_servers_configuration(self, sync_client):
+    def test_ice_servers_configuration(self, pooled_ws):
         """Test ICE servers are properly configured."""
-        with sync_client.websocket_connect("/ws?user_id=test_ice_config") as websocket:
-            connect_msg = json.loads(websocket.receive_text())
-            ice_servers = connect_msg["data"]["ice_servers"]
-
-            # Verify ICE servers structure
-            assert isinstance(ice_servers, list)
-
-            for server in ice_servers:
-                assert "urls" in server
-                # Should have STUN servers at minimum
-                if server["urls"].startswith("stun:"):
-                    print(f"STUN server: {server['urls']}")
-
-            print(f"✅ ICE servers configured: {len(ice_servers)} servers")
-
-    def test_webrtc_offer_with_nested_data(self, sync_client, mock_webrtc):
-        """Test WebRTC offer with nested data structure."""
-        with sync_client.websocket_connect("/ws?user_id=test_webrtc_nested") as websocket:
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
-
-            webrtc = mock_webrtc(session_id)
-            offer = webrtc.create_offer()
-
-            # Send offer with nested structure (backwards compatibility)
-            websocket.send_text(json.dumps({
-                "event": "webrtc_offer",
-                "session_id": session_id,
-                "data": {
-                    "offer": {
-                        "sdp": offer["sdp"],
-                        "type": offer["type"]
-                    }
-                }
-            }))
-
-            # Should still receive answer
-            answer_msg = json.loads(websocket.receive_text())
-            assert answer_msg["event"] == "webrtc_answer"
-
-            print("✅ Nested WebRTC offer handled correctly")
-
-    def test_invalid_webrtc_offer(self, sync_client):
-        """Test invalid WebRTC offer handling."""
-        with sync_client.websocket_connect("/ws?user_id=test_invalid_offer") as websocket:
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
-
-            # Send invalid offer (missing SDP)
-            websocket.send_text(json.dumps({
-                "event": "webrtc_offer",
-                "session_id": session_id,
-                "data": {
-                    "type": "offer"
-                    # Missing 'sdp' field
-                }
-            }))
-
-            # Server should handle gracefully (log error, no crash)
-            # Verify connection is still alive with heartbeat
-            websocket.send_text(json.dumps({
-                "event": "heartbeat",
-                "session_id": session_id,
-                "data": {}
-            }))
-
-            print("✅ Invalid WebRTC offer handled gracefully")
+        ice_servers = pooled_ws.ice_servers
+
+        # Verify ICE servers structure
+        assert isinstance(ice_servers, list)
+        assert len(ice_servers) > 0
+
+        for server in ice_servers:
+            assert "urls" in server
+            # Should have STUN servers at minimum
+            if server["urls"].startswith("stun:"):
+                log.info("STUN server: %s", server['urls'])
 
+        log.info("✅ ICE servers configured: %s servers", len(ice_servers))
 
 if __name__ == "__main__":
-    pytest.main([__file__, "-v", "-s"])
+    pytest.main([__file__, "-v", "--log-cli-level=INFO"])
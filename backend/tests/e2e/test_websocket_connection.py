@@ -4,21 +4,36 @@ E2E tests for WebSocket connection flow.
 Tests the basic WebSocket connection, message handling, and session management.
 """
 
-import pytest
-import json
+import os
 import asyncio
-from fastapi.testclient import TestClient
+import logging
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+import orjson
+from starlette.websockets import WebSocketDisconnect
+
+log = logging.getLogger(__name__)
+
+# Keeps user_ids distinct across pytest-xdist workers ("" when not under xdist)
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "")
+
+# Pre-serialized heartbeat event; fill in the session ID with %
+HEARTBEAT = orjson.dumps({"event": "heartbeat", "session_id": "%b", "data": {}})
+# Answered with voice_interrupted, an event the server never drops
+INTERRUPT = orjson.dumps({"event": "interrupt", "session_id": "%b", "data": {}})
 
 
 class TestWebSocketConnection:
     """Test WebSocket connection lifecycle."""
 
-    def test_websocket_connect(self, sync_client):
+    def test_websocket_connect(self, sync_client, session_id_pattern):
         """Test WebSocket connection establishment."""
-        with sync_client.websocket_connect("/ws?user_id=test_user_123") as websocket:
+        # ?binary=1: events arrive as binary frames, parsed straight from bytes
+        with sync_client.websocket_connect(f"/ws?user_id=test_user_123{XDIST_WORKER}&binary=1") as websocket:
             # Receive connection confirmation
-            data = websocket.receive_text()
-            message = json.loads(data)
+            data = websocket.receive_bytes()
+            message = orjson.loads(data)
 
             # Verify connection message
             assert message["event"] == "connected"
@@ -27,35 +42,21 @@ class TestWebSocketConnection:
             assert "timestamp" in message["data"]
 
             session_id = message["data"]["session_id"]
-            print(f"✅ Connected with session_id: {session_id}")
+            assert session_id_pattern.fullmatch(session_id)
+            log.info("✅ Connected with session_id: %s", session_id)
 
-    def test_websocket_heartbeat(self, sync_client):
+    def test_websocket_heartbeat(self, pooled_ws):
         """Test WebSocket heartbeat mechanism."""
-        with sync_client.websocket_connect("/ws?user_id=test_user_456") as websocket:
-            # Receive connection confirmation
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
-
-            # Send heartbeat
-            websocket.send_text(json.dumps({
-                "event": "heartbeat",
-                "session_id": session_id,
-                "data": {}
-            }))
-
-            # Should not receive any response (heartbeat is silent)
-            # Just verify connection is still alive
-            websocket.send_text(json.dumps({
-                "event": "heartbeat",
-                "session_id": session_id,
-                "data": {}
-            }))
-
-            print("✅ Heartbeat sent successfully")
-
-    def test_health_endpoint(self, sync_client):
+        websocket, session_id = pooled_ws.websocket, pooled_ws.session_id
+
+        # Send heartbeat; should not receive any response (heartbeat is silent)
+        websocket.send_bytes(HEARTBEAT % session_id.encode())
+
+        log.info("✅ Heartbeat sent successfully")
+
+    def test_health_endpoint(self, health_snapshot):
         """Test HTTP health check endpoint."""
-        response = sync_client.get("/health")
+        response = health_snapshot
 
         assert response.status_code == 200
         data = response.json()
@@ -68,11 +69,11 @@ class TestWebSocketConnection:
         assert data["components"]["webrtc"] is True
         assert data["components"]["agent"] is True
 
-        print(f"✅ Health check passed: {data}")
+        log.info("✅ Health check passed: %s", data)
 
-    def test_root_endpoint(self, sync_client):
+    def test_root_endpoint(self, root_snapshot):
         """Test root endpoint."""
-        response = sync_client.get("/")
+        response = root_snapshot
 
         assert response.status_code == 200
         data = response.json()
@@ -82,84 +83,88 @@ class TestWebSocketConnection:
         assert data["version"] == "1.0.0"
         assert "endpoints" in data
 
-        print(f"✅ Root endpoint: {data}")
+        log.info("✅ Root endpoint: %s", data)
 
-    def test_multiple_connections(self, sync_client):
+    def test_multiple_connections(self, sync_client, session_id_pattern):
         """Test multiple simultaneous WebSocket connections."""
-        connections = []
+        contexts = [
+            sync_client.websocket_connect(f"/ws?user_id=test_user_multi_{i}{XDIST_WORKER}&binary=1")
+            for i in range(3)
+        ]
 
-        # Open 3 connections
-        for i in range(3):
-            ws = sync_client.websocket_connect(f"/ws?user_id=test_user_multi_{i}")
-            connections.append(ws.__enter__())
+        # Open 3 connections and read their welcomes concurrently: TestClient
+        # WebSockets are blocking, so the handshakes overlap on threads
+        with ExitStack() as stack, ThreadPoolExecutor(len(contexts)) as executor:
+            connections = list(executor.map(stack.enter_context, contexts))
+            messages = executor.map(lambda ws: orjson.loads(ws.receive_bytes()), connections)
 
-        try:
             # Verify all connections are established
             session_ids = []
-            for ws in connections:
-                msg = json.loads(ws.receive_text())
+            for msg in messages:
                 assert msg["event"] == "connected"
+                assert session_id_pattern.fullmatch(msg["data"]["session_id"])
                 session_ids.append(msg["data"]["session_id"])
 
             # Verify all session IDs are unique
             assert len(session_ids) == len(set(session_ids))
-            print(f"✅ Opened {len(connections)} simultaneous connections")
-
-        finally:
-            # Close all connections
-            for ws in connections:
-                ws.__exit__(None, None, None)
+            log.info("✅ Opened %s simultaneous connections", len(connections))
 
-    def test_connection_with_anonymous_user(self, sync_client):
+    def test_connection_with_anonymous_user(self, sync_client, session_id_pattern):
         """Test connection with anonymous user (no user_id)."""
-        with sync_client.websocket_connect("/ws") as websocket:
-            msg = json.loads(websocket.receive_text())
+        with sync_client.websocket_connect("/ws?binary=1") as websocket:
+            msg = orjson.loads(websocket.receive_bytes())
 
             assert msg["event"] == "connected"
             assert "session_id" in msg["data"]
 
-            # Server should generate a UUID for anonymous users
+            # Server should generate a session ID for anonymous users
             session_id = msg["data"]["session_id"]
-            assert len(session_id) == 36  # UUID format
+            assert session_id_pattern.fullmatch(session_id)
 
-            print(f"✅ Anonymous connection: {session_id}")
+            log.info("✅ Anonymous connection: %s", session_id)
 
-    def test_invalid_message_format(self, sync_client):
-        """Test handling of invalid message format."""
-        with sync_client.websocket_connect("/ws?user_id=test_invalid") as websocket:
-            # Receive connection confirmation
-            connect_msg = json.loads(websocket.receive_text())
-            session_id = connect_msg["data"]["session_id"]
+    @pytest.mark.parametrize("bad_payload", [
+        pytest.param(b"not a json string", id="invalid_json"),
+        pytest.param(b"", id="empty_frame"),
+        pytest.param(b"[1, 2]", id="non_object_events"),
+        pytest.param(orjson.dumps({"event": "heartbeat", "data": {}}), id="no_session_id"),
+    ])
+    def test_malformed_input(self, pooled_ws, event_waiter, bad_payload):
+        """Test a malformed message is skipped and the session carries on."""
+        websocket, session_id = pooled_ws.websocket, pooled_ws.session_id
 
-            # Send invalid JSON
-            websocket.send_text("not a json string")
+        websocket.send_bytes(bad_payload)
 
-            # Server should handle gracefully (no crash)
-            # Send valid heartbeat to verify connection is still alive
-            websocket.send_text(json.dumps({
-                "event": "heartbeat",
-                "session_id": session_id,
-                "data": {}
-            }))
+        # The session is still served: an interrupt behind it gets its reply
+        websocket.send_bytes(INTERRUPT % session_id.encode())
+        assert event_waiter(websocket, {"voice_interrupted"}), "No reply after the malformed message"
 
-            print("✅ Invalid message handled gracefully")
+        log.info("✅ Malformed message handled gracefully")
 
-    def test_message_without_session_id(self, sync_client):
-        """Test message without session_id."""
-        with sync_client.websocket_connect("/ws?user_id=test_no_session") as websocket:
-            # Receive connection confirmation
-            json.loads(websocket.receive_text())
+    def test_outbox_overflow_closes_connection(
+        self, sync_client, session_id_reader, event_receiver, monkeypatch
+    ):
+        """Test a client that stops reading is disconnected once its outbox is full."""
+        import main
+
+        async def _stalled_send(session, websocket, payload):
+            await asyncio.Event().wait()
+
+        with sync_client.websocket_connect(f"/ws?user_id=test_outbox_overflow{XDIST_WORKER}") as websocket:
+            session_id = session_id_reader(websocket)
+
+            # From here on, nothing queued for this client is ever delivered
+            monkeypatch.setattr(main, "_send_frame", _stalled_send)
+            monkeypatch.setattr(main, "OUTBOX_LIMIT", 4)
 
-            # Send message without session_id
-            websocket.send_text(json.dumps({
-                "event": "heartbeat",
-                "data": {}
-            }))
+            for _ in range(main.OUTBOX_LIMIT + 3):
+                websocket.send_bytes(INTERRUPT % session_id.encode())
 
-            # Server should log warning but not crash
-            # Verify with another valid message
-            print("✅ Message without session_id handled")
+            with pytest.raises(WebSocketDisconnect) as closed:
+                event_receiver(websocket, timeout=2.0)
 
+        assert closed.value.code == main.OUTBOX_OVERFLOW_CLOSE_CODE
+        log.info("✅ Stalled client disconnected")
 
 if __name__ == "__main__":
-    pytest.main([__file__, "-v", "-s"])
+    pytest.main([__file__, "-v", "--log-cli-level=INFO"])